@@ -1,5 +1,10 @@
+from django import forms
 from django.contrib import admin
-from api import models
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.urls import path
+from api import models, seats, course_search, student_import
 
 @admin.register(models.Professor)
 class ProfessorAdmin(admin.ModelAdmin):
@@ -12,16 +17,69 @@ class StudentAdmin(admin.ModelAdmin):
     list_display = ('id_student', 'username', 'first_name', 'last_name', 'email', 'phone', 'career', 'year_admission', 'created_at', 'updated_at', 'password')
     search_fields = ('id_student', 'first_name', 'last_name', 'email', 'career', 'year_admission')
     list_filter = ('created_at','updated_at')
+    change_list_template = 'admin/api/student/change_list.html'
+
+    # Importación masiva desde un archivo CSV/JSONL (ver api.student_import)
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='api_student_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        # admin_view solo exige is_staff: importar crea estudiantes, así que requiere el permiso de agregar
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        context = {**self.admin_site.each_context(request), 'opts': self.model._meta, 'title': 'Importar estudiantes'}
+        form = StudentImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            uploaded = form.cleaned_data['file']
+            errors = []
+            summary = student_import.import_students(
+                student_import.open_text(uploaded.file),
+                student_import.detect_format(uploaded.name),
+                error_writer=_ErrorCollector(errors),
+            )
+            context.update(summary=summary, errors=errors[:StudentImportForm.MAX_ERRORS_SHOWN])
+        context['form'] = form
+        return TemplateResponse(request, 'admin/api/student/import.html', context)
+
+
+class StudentImportForm(forms.Form):
+    MAX_ERRORS_SHOWN = 200
+
+    file = forms.FileField(label="Archivo")
+
+
+# Recibe las filas rechazadas de la importación (misma interfaz que csv.writer)
+class _ErrorCollector:
+    def __init__(self, errors):
+        self.errors = errors
+
+    def writerows(self, rows):
+        self.errors.extend(rows)
+
 
 @admin.register(models.Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ('id_course', 'name', 'study_cycle', 'credits', 'duration_weeks', 'theory_hours', 'practice_hours', 'study_plan', 'subject_code')
+    list_display = ('id_course', 'name', 'study_cycle', 'credits', 'duration_weeks', 'theory_hours', 'practice_hours', 'study_plan', 'subject_code',
+                    'weight_partial_exam', 'weight_final_exam', 'weight_academic_work')
     search_fields = ('id_course', 'name', 'study_plan', 'subject_code')
     list_filter = ('created_at','updated_at')
 
+    # Usa el índice en memoria (sin tildes, por prefijo y tolerante a errores) en lugar de icontains sobre cada campo
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        matches = Q(id_course__in=course_search.search_ids(term))
+        if term.isdigit():
+            # El índice solo cubre nombre y código de asignatura: id_course y study_plan se buscan en la base de datos
+            matches |= Q(id_course=int(term)) | Q(study_plan__icontains=term)
+        return queryset.filter(matches), False
+
 @admin.register(models.OpenCourse)
 class OpenCourseAdmin(admin.ModelAdmin):
-    list_display = ('id_open_course', 'id_professor', 'id_course', 'start_class', 'end_class', 'academic_year', 'academic_semester', 'professional_career', 'section')
+    list_display = ('id_open_course', 'id_professor', 'id_course', 'start_class', 'end_class', 'academic_year', 'academic_semester', 'professional_career', 'section', 'capacity', 'enrolled_count')
     search_fields = ('id_professor__first_name','id_professor__last_name', 'id_professor__email', 'academic_year')
     list_filter = ('created_at','updated_at')
 
@@ -34,7 +92,13 @@ class OpenCourseAdmin(admin.ModelAdmin):
 
 @admin.register(models.EnrollStudent)
 class EnrollStudentAdmin(admin.ModelAdmin):
-    list_display = ('id_enroll_student', 'id_student', 'id_open_course')
+    # Las inscripciones creadas o movidas desde el admin recalculan el contador de vacantes de los cursos involucrados
+    def save_model(self, request, obj, form, change):
+        previous_open_course = form.initial.get('id_open_course') if change else None
+        super().save_model(request, obj, form, change)
+        seats.recount({obj.id_open_course_id, previous_open_course} - {None})
+
+    list_display = ('id_enroll_student', 'id_student', 'id_open_course', 'final_grade')
     search_fields = ('id_student__first_name','id_student__last_name', 'id_student__email',
                      'id_open_course__id_professor__first_name','id_open_course__id_professor__last_name', 'id_open_course__id_professor__email',
                      'id_open_course__academic_year')
@@ -54,3 +118,16 @@ class NoteAdmin(admin.ModelAdmin):
     list_display = ('id_note', 'id_enroll_student', 'type_note', 'note', 'created_at', 'updated_at')
     search_fields = ('id_enroll_student__id_student__first_name', 'id_enroll_student__id_student__last_name', 'id_enroll_student__id_student__email', 'type_note')
     list_filter = ('type_note', 'created_at', 'updated_at')
+
+@admin.register(models.AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('id_enroll_student', 'present_count', 'absent_count', 'late_count', 'last_class_date', 'absence_percentage', 'updated_at')
+    search_fields = ('id_enroll_student__id_student__first_name', 'id_enroll_student__id_student__last_name', 'id_enroll_student__id_student__email')
+    list_filter = ('last_class_date', 'updated_at')
+
+@admin.register(models.Waitlist)
+class WaitlistAdmin(admin.ModelAdmin):
+    list_display = ('id_waitlist', 'id_student', 'id_open_course', 'created_at')
+    search_fields = ('id_student__first_name', 'id_student__last_name', 'id_student__email',
+                     'id_open_course__id_professor__email', 'id_open_course__academic_year')
+    list_filter = ('created_at',)
@@ -0,0 +1,179 @@
+from collections import Counter, defaultdict
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from api import models
+
+
+# Mantenimiento incremental de AttendanceSummary (una fila por inscripción)
+
+
+def apply_attendance_changes(added=(), removed=()):
+    """
+    Actualiza los resúmenes de asistencia a partir de las asistencias creadas (added) y eliminadas (removed).
+    Una modificación se registra como la eliminación del valor anterior más la creación del nuevo.
+    Debe llamarse después de escribir las asistencias: las inscripciones sin resumen se reconstruyen desde la base de datos.
+    """
+    deltas = defaultdict(Counter)
+    newest_date = {}
+    stale_last_date = set()
+
+    for enroll_id, attendance_date, value in map(_as_row, added):
+        deltas[enroll_id][value] += 1
+        if enroll_id not in newest_date or attendance_date > newest_date[enroll_id]:
+            newest_date[enroll_id] = attendance_date
+    for enroll_id, attendance_date, value in map(_as_row, removed):
+        deltas[enroll_id][value] -= 1
+        stale_last_date.add((enroll_id, attendance_date))
+
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        summaries = {
+            summary.id_enroll_student_id: summary
+            for summary in models.AttendanceSummary.objects.select_for_update().filter(id_enroll_student__in=deltas.keys())
+        }
+
+        # Las inscripciones sin resumen (datos anteriores al resumen) se reconstruyen por completo
+        missing = [enroll_id for enroll_id in deltas if enroll_id not in summaries]
+        if missing:
+            rebuild_summaries(missing)
+
+        now = timezone.now()
+        recompute_last_date = []
+        for enroll_id, summary in summaries.items():
+            for value, delta in deltas[enroll_id].items():
+                field = models.AttendanceSummary.COUNT_FIELDS[value]
+                setattr(summary, field, max(getattr(summary, field) + delta, 0))
+            if enroll_id in newest_date and (summary.last_class_date is None or newest_date[enroll_id] > summary.last_class_date):
+                summary.last_class_date = newest_date[enroll_id]
+            if (enroll_id, summary.last_class_date) in stale_last_date:
+                recompute_last_date.append(enroll_id)
+            summary.absence_percentage = absence_percentage(summary.absent_count, summary.total_count)
+            summary.updated_at = now
+
+        # Si se eliminó la última fecha registrada, se vuelve a calcular con una sola consulta agregada
+        if recompute_last_date:
+            last_dates = dict(
+                models.Attendance.objects.filter(id_enroll_student__in=recompute_last_date)
+                .values('id_enroll_student')
+                .annotate(last=Max('date'))
+                .values_list('id_enroll_student', 'last')
+            )
+            for enroll_id in recompute_last_date:
+                summaries[enroll_id].last_class_date = last_dates.get(enroll_id)
+
+        models.AttendanceSummary.objects.bulk_update(
+            summaries.values(),
+            ['present_count', 'absent_count', 'late_count', 'last_class_date', 'absence_percentage', 'updated_at']
+        )
+
+
+def rebuild_summaries(enroll_ids=None, batch_size=1000):
+    """
+    Reconstruye desde cero los resúmenes de las inscripciones indicadas (o de todas si enroll_ids es None).
+    Retorna la cantidad de resúmenes escritos.
+    """
+    enrollments = models.EnrollStudent.objects.order_by('id_enroll_student')
+    if enroll_ids is not None:
+        enrollments = enrollments.filter(id_enroll_student__in=list(enroll_ids))
+
+    written = 0
+    batch = []
+    for enroll_id in enrollments.values_list('id_enroll_student', flat=True).iterator(chunk_size=batch_size):
+        batch.append(enroll_id)
+        if len(batch) >= batch_size:
+            written += _rebuild_batch(batch)
+            batch = []
+    if batch:
+        written += _rebuild_batch(batch)
+    return written
+
+
+def get_summaries(enroll_ids):
+    """
+    Retorna {id_enroll_student: AttendanceSummary} para las inscripciones indicadas. Solo lee: las inscripciones
+    sin resumen (anteriores a la tabla y aún no reconstruidas con rebuild_attendance_summary) se calculan en
+    memoria con una consulta agregada y no se guardan.
+    """
+    enroll_ids = list(enroll_ids)
+    summaries = {s.id_enroll_student_id: s for s in models.AttendanceSummary.objects.filter(id_enroll_student__in=enroll_ids)}
+    missing = [enroll_id for enroll_id in enroll_ids if enroll_id not in summaries]
+    if missing:
+        summaries.update({summary.id_enroll_student_id: summary for summary in _build_summaries(missing)})
+    return summaries
+
+
+def create_empty_summaries(enroll_ids):
+    """
+    Crea el resumen en cero de inscripciones nuevas (todavía sin asistencias), para que las lecturas no tengan
+    que calcularlo. Las que ya tengan resumen se dejan como están.
+    """
+    models.AttendanceSummary.objects.bulk_create(
+        [models.AttendanceSummary(id_enroll_student_id=enroll_id) for enroll_id in enroll_ids],
+        ignore_conflicts=True,
+    )
+
+
+def absence_percentage(absent_count, total_count):
+    if not total_count:
+        return Decimal('0.00')
+    return (Decimal(absent_count) * 100 / Decimal(total_count)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def _rebuild_batch(enroll_ids):
+    """
+    Reemplaza los resúmenes de un lote de inscripciones por los calculados desde sus asistencias.
+    """
+    summaries = _build_summaries(enroll_ids)
+    with transaction.atomic():
+        models.AttendanceSummary.objects.filter(id_enroll_student__in=enroll_ids).delete()
+        models.AttendanceSummary.objects.bulk_create(summaries)
+    return len(summaries)
+
+
+def _build_summaries(enroll_ids):
+    """
+    Calcula (sin guardar) los resúmenes de un lote de inscripciones con una sola consulta agregada.
+    """
+    aggregates = {
+        row['id_enroll_student']: row
+        for row in models.Attendance.objects.filter(id_enroll_student__in=enroll_ids)
+        .values('id_enroll_student')
+        .annotate(
+            present_count=Count('id_attendance', filter=Q(attendance=0)),
+            absent_count=Count('id_attendance', filter=Q(attendance=1)),
+            late_count=Count('id_attendance', filter=Q(attendance=2)),
+            last_class_date=Max('date'),
+        )
+    }
+
+    summaries = []
+    for enroll_id in enroll_ids:
+        row = aggregates.get(enroll_id, {})
+        summary = models.AttendanceSummary(
+            id_enroll_student_id=enroll_id,
+            present_count=row.get('present_count', 0),
+            absent_count=row.get('absent_count', 0),
+            late_count=row.get('late_count', 0),
+            last_class_date=row.get('last_class_date'),
+        )
+        summary.absence_percentage = absence_percentage(summary.absent_count, summary.total_count)
+        summaries.append(summary)
+    return summaries
+
+
+def _as_row(attendance):
+    """
+    Acepta una instancia de Attendance o una tupla (id_enroll_student, date, attendance).
+    """
+    if isinstance(attendance, models.Attendance):
+        enroll_id, attendance_date, value = attendance.id_enroll_student_id, attendance.date, attendance.attendance
+    else:
+        enroll_id, attendance_date, value = attendance
+    if isinstance(attendance_date, str):
+        attendance_date = date.fromisoformat(attendance_date)
+    return enroll_id, attendance_date, int(value)
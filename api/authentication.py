@@ -0,0 +1,182 @@
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from api import models
+
+
+# Autenticación de la API y resolución del rol del usuario autenticado.
+# Ambas clases dejan en el request el perfil concreto del usuario (request.professor / request.student, None si
+# no tiene ese rol), resuelto en la misma consulta de la autenticación, para que las vistas no vuelvan a buscarlo.
+#
+# Tokens de acceso firmados (HMAC con SECRET_KEY) y con expiración, como alternativa a TokenAuthentication.
+# El token lleva el id del usuario, el rol (professor/student) y la clave primaria del rol, por lo que verificarlo
+# no consulta la base de datos: el usuario se arma en memoria con su Professor/Student ya cargado.
+# Se envían como "Authorization: Bearer <token>" y cada vista elige si los acepta con @authentication_classes.
+# Los tokens revocados se guardan en un conjunto en memoria del proceso hasta que expiran.
+
+ACCESS_TOKEN_LIFETIME = getattr(settings, 'API_ACCESS_TOKEN_LIFETIME', 15 * 60)
+REFRESH_TOKEN_LIFETIME = getattr(settings, 'API_REFRESH_TOKEN_LIFETIME', 7 * 24 * 60 * 60)
+KEYWORD = 'Bearer'
+ROLES = {
+    'professor': (models.Professor, 'id_professor'),
+    'student': (models.Student, 'id_student'),
+}
+
+_SALTS = {'access': 'api.authentication.access', 'refresh': 'api.authentication.refresh'}
+_LIFETIMES = {'access': ACCESS_TOKEN_LIFETIME, 'refresh': REFRESH_TOKEN_LIFETIME}
+
+_revoked_lock = threading.Lock()
+# jti -> instante en que el token expira (después de eso ya no hace falta recordarlo)
+_revoked = {}
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != KEYWORD.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Encabezado Authorization inválido.")
+
+        try:
+            payload = verify_token(auth[1].decode(), 'access')
+        except (signing.BadSignature, UnicodeError):
+            raise exceptions.AuthenticationFailed("Token inválido o expirado.")
+        user = build_user(payload)
+        attach_roles(request, user)
+        return user, payload
+
+    def authenticate_header(self, request):
+        return KEYWORD
+
+
+class RoleTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que trae el usuario y su Professor/Student en el mismo join que el token (1 consulta).
+    """
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            attach_roles(request, result[0])
+        return result
+
+    def authenticate_credentials(self, key):
+        try:
+            token = (
+                self.get_model().objects
+                .select_related('user', 'user__professor', 'user__student')
+                .get(key=key)
+            )
+        except self.get_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed("Token inválido.")
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed("Usuario inactivo o eliminado.")
+        return (token.user, token)
+
+
+def attach_roles(request, user):
+    """
+    Guarda en el request el perfil de cada rol del usuario; usa las relaciones ya cargadas en user.
+    """
+    for role in ROLES:
+        setattr(request, role, getattr(user, role, None))
+
+
+def full_profile(profile):
+    """
+    Retorna el perfil con todas sus columnas. Los perfiles armados desde un token firmado solo traen los datos
+    del token; en ese caso se cargan con una consulta.
+    """
+    if not profile.get_deferred_fields():
+        return profile
+    return type(profile).objects.get(pk=profile.pk)
+
+
+def issue_tokens(user, role):
+    """
+    Retorna {"access", "refresh", "expires_in"} para el usuario (instancia de Professor o Student).
+    """
+    model, pk_field = ROLES[role]
+    payload = {
+        "uid": user.id,
+        "role": role,
+        "rid": getattr(user, pk_field),
+        "email": user.email,
+    }
+    return {
+        "access": _sign(payload, 'access'),
+        "refresh": _sign(payload, 'refresh'),
+        "expires_in": ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def verify_token(token, token_type):
+    """
+    Retorna el contenido del token o lanza signing.BadSignature (firma inválida, expirado, de otro tipo o revocado).
+    """
+    payload = signing.loads(token, salt=_SALTS[token_type], max_age=_LIFETIMES[token_type])
+    if payload.get('typ') != token_type or payload.get('role') not in ROLES:
+        raise signing.BadSignature("Tipo de token inválido.")
+    if is_revoked(payload['jti']):
+        raise signing.BadSignature("Token revocado.")
+    return payload
+
+
+def refresh_tokens(refresh_token):
+    """
+    Canjea un refresh token por un par nuevo; el refresh token usado queda revocado (rotación).
+    Es la única operación que consulta la base de datos, para no renovar usuarios eliminados o inactivos.
+    """
+    payload = verify_token(refresh_token, 'refresh')
+    model, pk_field = ROLES[payload['role']]
+    user = model.objects.filter(**{pk_field: payload['rid']}, id=payload['uid'], is_active=True).first()
+    if user is None:
+        raise signing.BadSignature("El usuario ya no está activo.")
+    revoke(payload)
+    return issue_tokens(user, payload['role'])
+
+
+def revoke(payload):
+    with _revoked_lock:
+        now = time.time()
+        for jti in [jti for jti, expires_at in _revoked.items() if expires_at <= now]:
+            del _revoked[jti]
+        _revoked[payload['jti']] = payload['iat'] + _LIFETIMES[payload['typ']]
+
+
+def is_revoked(jti):
+    with _revoked_lock:
+        expires_at = _revoked.get(jti)
+    return expires_at is not None and expires_at > time.time()
+
+
+def build_user(payload):
+    """
+    Arma el usuario autenticado sin consultar la base de datos. El perfil del rol queda en la caché de relaciones,
+    así hasattr(user, 'professor') y user.student no generan consultas.
+    """
+    user = User(id=payload['uid'], username=payload['email'], email=payload['email'], is_active=True)
+    for role, (model, pk_field) in ROLES.items():
+        profile = None
+        if role == payload['role']:
+            # Las columnas que no vienen en el token quedan diferidas: si se leen, Django las consulta
+            known = {'id': payload['uid'], 'user_ptr_id': payload['uid'], 'username': payload['email'],
+                     'email': payload['email'], 'is_active': True, pk_field: payload['rid']}
+            field_names = [field.attname for field in model._meta.concrete_fields if field.attname in known]
+            profile = model.from_db('default', field_names, [known[name] for name in field_names])
+        user._state.fields_cache[role] = profile
+    return user
+
+
+def _sign(payload, token_type):
+    return signing.dumps(
+        {**payload, "typ": token_type, "jti": uuid.uuid4().hex, "iat": int(time.time())},
+        salt=_SALTS[token_type],
+        compress=True,
+    )
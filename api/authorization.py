@@ -0,0 +1,40 @@
+from api import models
+
+
+# Verificación de que un registro pertenece al profesor autenticado.
+# El dueño de un registro es el profesor de su curso aperturado; la cadena de claves foráneas
+# (Nota/Asistencia -> Inscripción -> Curso aperturado -> Profesor) se resuelve con un solo join en la base de datos,
+# sin cargar los objetos intermedios uno por uno.
+
+# Ruta desde cada modelo hasta la clave del profesor dueño
+OWNER_PATHS = {
+    models.OpenCourse: 'id_professor',
+    models.EnrollStudent: 'id_open_course__id_professor',
+    models.Note: 'id_enroll_student__id_open_course__id_professor',
+    models.Attendance: 'id_enroll_student__id_open_course__id_professor',
+}
+
+
+def owner(model, pk):
+    """
+    Retorna el id del profesor dueño del registro o None si el registro no existe (1 consulta).
+    """
+    return model.objects.filter(pk=pk).values_list(OWNER_PATHS[model], flat=True).first()
+
+
+def owners(model, ids):
+    """
+    Retorna {id: id_professor dueño} de los registros que existen (1 consulta).
+    Para las vistas que distinguen un registro inexistente (404) de uno ajeno (403).
+    """
+    if not ids:
+        return {}
+    return dict(model.objects.filter(pk__in=list(ids)).values_list('pk', OWNER_PATHS[model]))
+
+
+def owns_open_course(professor, open_course):
+    """
+    True si el curso aperturado ya cargado pertenece al profesor (sin consultas).
+    """
+    return professor is not None and open_course.id_professor_id == professor.id_professor
+
@@ -0,0 +1,37 @@
+import time
+from django.core.cache import cache
+
+
+# Versiones de caché por espacio de nombres: en vez de borrar todas las claves derivadas,
+# se incrementa la versión y las claves anteriores dejan de usarse (y expiran solas).
+
+
+def get_version(namespace):
+    """
+    Retorna la versión actual del espacio de nombres, inicializándola si no existe.
+    El valor inicial depende del tiempo para no reutilizar versiones si la caché se reinicia.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # La clave no existía (o expiró): se inicializa con una versión nueva
+        cache.add(key, int(time.time() * 1000), None)
+        return cache.get(key)
+
+
+def versioned_key(namespace, *parts):
+    return ":".join([namespace, f"v{get_version(namespace)}", *map(str, parts)])
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
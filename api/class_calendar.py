@@ -0,0 +1,92 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from django.core.cache import cache
+from api import models
+
+
+# Calendario de clases de un curso aperturado: fechas concretas generadas a partir de sus horarios (Schedule)
+# entre start_class y end_class. Se guarda en caché y se invalida cuando cambian los horarios o las fechas del curso.
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class ClassCalendar:
+    def __init__(self, id_open_course, dates):
+        self.id_open_course = id_open_course
+        self.dates = tuple(sorted(dates))
+        self._date_set = frozenset(self.dates)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __iter__(self):
+        return iter(self.dates)
+
+    def is_class_day(self, day):
+        """
+        Indica si la fecha es un día de clase (búsqueda O(1) en un conjunto).
+        """
+        return day in self._date_set
+
+    def next_class(self, after=None):
+        """
+        Retorna la primera fecha de clase desde 'after' (por defecto hoy), o None si el curso ya terminó.
+        """
+        index = bisect_left(self.dates, after or date.today())
+        return self.dates[index] if index < len(self.dates) else None
+
+    def classes_until(self, day=None):
+        """
+        Cantidad de clases dictadas hasta 'day' inclusive (por defecto hoy).
+        """
+        return bisect_right(self.dates, day or date.today())
+
+    def absence_rate(self, absent_count, day=None):
+        """
+        Porcentaje de faltas usando como denominador las clases dictadas hasta 'day' según el calendario.
+        """
+        held = self.classes_until(day)
+        if not held:
+            return Decimal('0.00')
+        return (Decimal(absent_count) * 100 / Decimal(held)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def expand_class_dates(start_class, end_class, weekdays):
+    """
+    Genera las fechas entre start_class y end_class (inclusive) cuyo día de la semana esté en weekdays (0 = Lunes).
+    """
+    weekdays = set(weekdays)
+    dates = []
+    if not weekdays or start_class > end_class:
+        return dates
+    for weekday in weekdays:
+        current = start_class + timedelta(days=(weekday - start_class.weekday()) % 7)
+        while current <= end_class:
+            dates.append(current)
+            current += timedelta(days=7)
+    dates.sort()
+    return dates
+
+
+def get_calendar(open_course):
+    """
+    Retorna el ClassCalendar de un curso aperturado (instancia o id), usando la caché si está disponible.
+    """
+    id_open_course = open_course.id_open_course if isinstance(open_course, models.OpenCourse) else int(open_course)
+    ordinals = cache.get(_cache_key(id_open_course))
+    if ordinals is None:
+        if not isinstance(open_course, models.OpenCourse):
+            open_course = models.OpenCourse.objects.only('start_class', 'end_class').get(id_open_course=id_open_course)
+        weekdays = models.Schedule.objects.filter(id_open_course=id_open_course).values_list('day_week', flat=True)
+        ordinals = [day.toordinal() for day in expand_class_dates(open_course.start_class, open_course.end_class, weekdays)]
+        cache.set(_cache_key(id_open_course), ordinals, CACHE_TIMEOUT)
+    return ClassCalendar(id_open_course, (date.fromordinal(ordinal) for ordinal in ordinals))
+
+
+def invalidate(id_open_course):
+    cache.delete(_cache_key(id_open_course))
+
+
+def _cache_key(id_open_course):
+    return f"class_calendar:{id_open_course}"
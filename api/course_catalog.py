@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from api import models, serializers, cache_versions
+
+
+# Catálogo de cursos serializado y guardado en caché.
+# El catálogo cambia pocas veces al año: cada combinación de filtros se serializa una sola vez por versión y la
+# versión se incrementa al guardar o eliminar cualquier Course. El ETag se arma con la versión y los filtros,
+# por lo que un cliente con el catálogo al día recibe un 304 sin que se consulte la base de datos.
+
+NAMESPACE = "course_catalog"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# Filtros permitidos y su conversión desde los query params
+FILTERS = {
+    'study_plan': int,
+    'study_cycle': int,
+    'course_type': str,
+    'study_type': str,
+}
+
+
+def parse_filters(query_params):
+    """
+    Retorna (filtros, error) a partir de los query params; los valores se validan contra las opciones del modelo.
+    """
+    filters = {}
+    for field, cast in FILTERS.items():
+        value = query_params.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            value = cast(value)
+        except ValueError:
+            return None, f"El campo '{field}' debe ser un número entero."
+        choices = models.Course._meta.get_field(field).choices
+        if choices and value not in dict(choices):
+            return None, f"Valor inválido para '{field}': {value}."
+        filters[field] = value
+    return filters, None
+
+
+def etag(filters):
+    parts = [f"{field}={filters[field]}" for field in sorted(filters)]
+    return '"' + "-".join([f"catalog.v{cache_versions.get_version(NAMESPACE)}", *parts]) + '"'
+
+
+def get_catalog(filters):
+    """
+    Lista de cursos serializados que cumplen los filtros, tomada de la caché si la versión no cambió.
+    """
+    key = cache_versions.versioned_key(NAMESPACE, *(f"{field}={filters[field]}" for field in sorted(filters)))
+    data = cache.get(key)
+    if data is None:
+        courses = models.Course.objects.filter(**filters).order_by('id_course')
+        data = serializers.CourseSerializer(instance=courses, many=True).data
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+def invalidate():
+    cache_versions.bump_version(NAMESPACE)
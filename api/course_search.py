@@ -0,0 +1,136 @@
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from api import cache_versions, course_catalog
+
+
+# Búsqueda de cursos por nombre y código de asignatura sin consultar la base de datos.
+# El índice se arma en memoria a partir del catálogo en caché (api.course_catalog) y se reconstruye solo cuando
+# cambia la versión del catálogo. Las palabras se normalizan sin tildes ni mayúsculas; cada palabra de la búsqueda
+# se resuelve por prefijo (búsqueda binaria sobre las palabras ordenadas) y, si no hay coincidencias, por trigramas
+# para tolerar errores de tipeo. Solo se retornan los cursos que coinciden con todas las palabras.
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Proporción mínima de trigramas compartidos para aceptar una palabra parecida
+TRIGRAM_THRESHOLD = 0.4
+
+_lock = threading.Lock()
+_index = None
+
+
+def normalize(text):
+    """
+    Texto en minúsculas, sin tildes y con cualquier carácter no alfanumérico reemplazado por un espacio.
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return "".join(char if char.isalnum() else " " for char in text)
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CourseSearchIndex:
+    def __init__(self, courses):
+        """
+        courses: iterable de dicts con id_course, name y subject_code (como los del catálogo serializado).
+        """
+        self.courses = {}
+        self._names = {}
+        words = defaultdict(set)
+        for course in courses:
+            self.courses[course['id_course']] = course
+            self._names[course['id_course']] = normalize(course['name'])
+            for word in self._names[course['id_course']].split():
+                words[word].add(course['id_course'])
+            words[str(course['subject_code'])].add(course['id_course'])
+
+        self._words = sorted(words)
+        self._ids_by_word = dict(words)
+        self._words_by_trigram = defaultdict(set)
+        for word in self._words:
+            for trigram in trigrams(word):
+                self._words_by_trigram[trigram].add(word)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Retorna [(puntaje, id_course)] ordenado de mayor a menor puntaje (limit=None retorna todos).
+        """
+        terms = normalize(query).split()
+        if not terms:
+            return []
+
+        scores = None
+        for term in terms:
+            term_scores = self._match_term(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {id_course: score + term_scores[id_course] for id_course, score in scores.items() if id_course in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(
+            ((round(score, 3), id_course) for id_course, score in scores.items()),
+            key=lambda item: (-item[0], self._names[item[1]], item[1]),
+        )
+        return ranked if limit is None else ranked[:limit]
+
+    def _match_term(self, term):
+        """
+        Retorna {id_course: puntaje} de una palabra: 3 si coincide exactamente, 2 por prefijo
+        y la similitud de trigramas (entre TRIGRAM_THRESHOLD y 1) si solo se parece.
+        """
+        scores = {}
+        position = bisect_left(self._words, term)
+        while position < len(self._words) and self._words[position].startswith(term):
+            word = self._words[position]
+            score = 3 if word == term else 2
+            for id_course in self._ids_by_word[word]:
+                scores[id_course] = max(scores.get(id_course, 0), score)
+            position += 1
+        if scores:
+            return scores
+
+        term_trigrams = trigrams(term)
+        shared = defaultdict(int)
+        for trigram in term_trigrams:
+            for word in self._words_by_trigram.get(trigram, ()):
+                shared[word] += 1
+        for word, count in shared.items():
+            similarity = count / len(term_trigrams | trigrams(word))
+            if similarity >= TRIGRAM_THRESHOLD:
+                for id_course in self._ids_by_word[word]:
+                    scores[id_course] = max(scores.get(id_course, 0), similarity)
+        return scores
+
+
+def get_index():
+    """
+    Índice vigente; se reconstruye si la versión del catálogo cambió desde la última construcción.
+    """
+    global _index
+    version = cache_versions.get_version(course_catalog.NAMESPACE)
+    current = _index
+    if current is not None and current[0] == version:
+        return current[1]
+    with _lock:
+        if _index is None or _index[0] != version:
+            _index = (version, CourseSearchIndex(course_catalog.get_catalog({})))
+        return _index[1]
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    """
+    Retorna los cursos serializados que coinciden con la búsqueda, cada uno con su campo 'score'.
+    """
+    index = get_index()
+    return [dict(index.courses[id_course], score=score) for score, id_course in index.search(query, limit)]
+
+
+def search_ids(query):
+    return [id_course for _, id_course in get_index().search(query, limit=None)]
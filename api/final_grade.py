@@ -0,0 +1,79 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from api import models, transcript
+
+
+# Cálculo del promedio final ponderado (EnrollStudent.final_grade) según los pesos de Course.
+# El promedio queda en null hasta que estén registradas todas las notas con peso: una nota pendiente no cuenta
+# como 0, para no guardar (ni llevar al historial académico) un promedio desaprobatorio que aún no es definitivo.
+
+
+def compute_final_grade(weights, notes_by_type):
+    """
+    weights: {type_note: peso}, notes_by_type: {type_note: nota}.
+    Retorna None si falta la nota de algún tipo con peso mayor que 0.
+    """
+    weights = {type_note: weight for type_note, weight in weights.items() if weight}
+    if not weights or any(type_note not in notes_by_type for type_note in weights):
+        return None
+    total_weight = sum(weights.values())
+    weighted = sum(Decimal(weight) * notes_by_type[type_note] for type_note, weight in weights.items())
+    return (weighted / total_weight).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def recompute_final_grades(enroll_ids):
+    """
+    Recalcula y guarda el promedio final de las inscripciones indicadas con dos consultas y un bulk_update,
+    e invalida el historial académico en caché de sus estudiantes.
+    """
+    enroll_ids = list(enroll_ids)
+    if not enroll_ids:
+        return
+
+    weight_fields = list(models.Course.NOTE_WEIGHT_FIELDS.items())
+    weights_by_enroll = {}
+    student_ids = set()
+    for row in models.EnrollStudent.objects.filter(id_enroll_student__in=enroll_ids).values(
+        'id_enroll_student', 'id_student', *[f'id_open_course__id_course__{field}' for _, field in weight_fields]
+    ):
+        weights_by_enroll[row['id_enroll_student']] = {
+            type_note: row[f'id_open_course__id_course__{field}'] for type_note, field in weight_fields
+        }
+        student_ids.add(row['id_student'])
+
+    notes_by_enroll = defaultdict(dict)
+    for enroll_id, type_note, note in (
+        models.Note.objects.filter(id_enroll_student__in=weights_by_enroll.keys())
+        .order_by('id_note')
+        .values_list('id_enroll_student', 'type_note', 'note')
+    ):
+        notes_by_enroll[enroll_id][type_note] = note
+
+    enrollments = [
+        models.EnrollStudent(
+            id_enroll_student=enroll_id,
+            final_grade=compute_final_grade(weights, notes_by_enroll.get(enroll_id, {})),
+        )
+        for enroll_id, weights in weights_by_enroll.items()
+    ]
+
+    with transaction.atomic():
+        models.EnrollStudent.objects.bulk_update(enrollments, ['final_grade'], batch_size=500)
+
+    # El historial académico en caché de esos estudiantes depende del promedio final
+    for id_student in student_ids:
+        transcript.invalidate(id_student)
+
+
+def recompute_course_final_grades(id_course, batch_size=500):
+    """
+    Recalcula el promedio final de todas las inscripciones de un curso (p. ej. al cambiar sus pesos).
+    """
+    enroll_ids = list(
+        models.EnrollStudent.objects.filter(id_open_course__id_course=id_course)
+        .order_by('id_enroll_student')
+        .values_list('id_enroll_student', flat=True)
+    )
+    for start in range(0, len(enroll_ids), batch_size):
+        recompute_final_grades(enroll_ids[start:start + batch_size])
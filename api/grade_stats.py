@@ -0,0 +1,124 @@
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from math import sqrt
+from django.core.cache import cache
+from api import models, cache_versions
+
+
+# Estadísticas de notas (escala 0-20) por tipo de nota para una sección o para todas las secciones de un curso.
+# Las notas se leen con una sola consulta a un arreglo compacto de enteros y todas las medidas se obtienen
+# del histograma de 21 posiciones, sin ordenar ni recorrer la lista más de una vez.
+
+MAX_NOTE = 20
+PASSING_NOTE = 11
+PERCENTILES = (10, 25, 50, 75, 90)
+CACHE_TIMEOUT = 60 * 60
+
+
+def get_stats(open_course, scope='section'):
+    """
+    Retorna {type_note: estadísticas} del curso aperturado (scope='section') o de todas las secciones
+    del mismo curso en el mismo año y semestre (scope='course'). El resultado se guarda en caché
+    hasta que cambie una nota de ese curso.
+    """
+    key = cache_versions.versioned_key(_namespace(open_course.id_course_id), scope, _scope_id(open_course, scope))
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(_scope_notes(open_course, scope))
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def compute_stats(notes):
+    """
+    notes: queryset o iterable de (type_note, note).
+    """
+    values_by_type = {type_note: array('h') for type_note, _ in models.Note.TYPE_NOTE_CHOICES}
+    for type_note, note in notes:
+        values_by_type.setdefault(type_note, array('h')).append(note)
+    return {type_note: describe(values) for type_note, values in values_by_type.items()}
+
+
+def describe(values):
+    """
+    Estadísticas de un arreglo de notas enteras entre 0 y MAX_NOTE.
+    """
+    histogram = [0] * (MAX_NOTE + 1)
+    for value in values:
+        if 0 <= value <= MAX_NOTE:
+            histogram[value] += 1
+
+    count = sum(histogram)
+    if not count:
+        return {"count": 0, "histogram": histogram, "mean": None, "median": None, "std": None,
+                "min": None, "max": None, "percentiles": {}, "pass_rate": None}
+
+    total = sum(note * frequency for note, frequency in enumerate(histogram))
+    mean = total / count
+    variance = sum(frequency * (note - mean) ** 2 for note, frequency in enumerate(histogram)) / count
+    cumulative = list(accumulate(histogram))
+    passed = count - cumulative[PASSING_NOTE - 1]
+
+    return {
+        "count": count,
+        "histogram": histogram,
+        "mean": round(mean, 2),
+        "median": _percentile(cumulative, count, 50),
+        "std": round(sqrt(variance), 2),
+        "min": next(note for note, frequency in enumerate(histogram) if frequency),
+        "max": next(note for note in range(MAX_NOTE, -1, -1) if histogram[note]),
+        "percentiles": {str(p): _percentile(cumulative, count, p) for p in PERCENTILES},
+        "pass_rate": round(passed * 100 / count, 2),
+    }
+
+
+def invalidate_for_enrollments(enroll_ids):
+    """
+    Invalida las estadísticas en caché de los cursos a los que pertenecen las inscripciones indicadas.
+    """
+    course_ids = set(
+        models.EnrollStudent.objects.filter(id_enroll_student__in=list(enroll_ids))
+        .values_list('id_open_course__id_course', flat=True)
+    )
+    for id_course in course_ids:
+        invalidate_course(id_course)
+
+
+def invalidate_course(id_course):
+    cache_versions.bump_version(_namespace(id_course))
+
+
+def _percentile(cumulative, count, p):
+    """
+    Percentil con interpolación lineal entre rangos (mismo criterio que numpy.percentile por defecto).
+    """
+    position = (count - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, count - 1)
+    lower_value = bisect_right(cumulative, lower)
+    upper_value = bisect_right(cumulative, upper)
+    return round(lower_value + (upper_value - lower_value) * (position - lower), 2)
+
+
+def _scope_notes(open_course, scope):
+    notes = models.Note.objects.all()
+    if scope == 'course':
+        notes = notes.filter(
+            id_enroll_student__id_open_course__id_course=open_course.id_course_id,
+            id_enroll_student__id_open_course__academic_year=open_course.academic_year,
+            id_enroll_student__id_open_course__academic_semester=open_course.academic_semester,
+        )
+    else:
+        notes = notes.filter(id_enroll_student__id_open_course=open_course.id_open_course)
+    return notes.values_list('type_note', 'note').iterator(chunk_size=2000)
+
+
+def _scope_id(open_course, scope):
+    if scope == 'course':
+        return f"{open_course.academic_year}-{open_course.academic_semester}"
+    return open_course.id_open_course
+
+
+def _namespace(id_course):
+    return f"grade_stats:course:{id_course}"
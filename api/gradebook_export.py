@@ -0,0 +1,103 @@
+import csv
+import json
+from itertools import islice
+from api import models, class_calendar
+
+
+# Exportación pivotada (una fila por alumno) de asistencias y notas de un curso aperturado.
+# Las filas se generan por lotes de inscripciones para que la memoria no dependa del tamaño del curso.
+
+CHUNK_SIZE = 500
+
+STUDENT_COLUMNS = ['id_enroll_student', 'id_student', 'email', 'first_name', 'last_name']
+
+
+class _Echo:
+    """
+    Objeto tipo archivo cuyo write() retorna el valor escrito, para usar csv.writer como generador.
+    """
+    def write(self, value):
+        return value
+
+
+def export_rows(open_course, chunk_size=CHUNK_SIZE):
+    """
+    Genera (student, attendance_by_date, notes_by_type) por cada alumno inscrito en el curso aperturado.
+    """
+    enrollments = (
+        models.EnrollStudent.objects.filter(id_open_course=open_course.id_open_course)
+        .order_by('id_enroll_student')
+        .values_list(
+            'id_enroll_student',
+            'id_student__id_student',
+            'id_student__email',
+            'id_student__first_name',
+            'id_student__last_name',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    while True:
+        chunk = list(islice(enrollments, chunk_size))
+        if not chunk:
+            return
+        enroll_ids = [row[0] for row in chunk]
+
+        attendance_by_enroll = {enroll_id: {} for enroll_id in enroll_ids}
+        for enroll_id, attendance_date, value in (
+            models.Attendance.objects.filter(id_enroll_student__in=enroll_ids)
+            .values_list('id_enroll_student', 'date', 'attendance')
+            .iterator(chunk_size=chunk_size)
+        ):
+            attendance_by_enroll[enroll_id][attendance_date] = value
+
+        notes_by_enroll = {enroll_id: {} for enroll_id in enroll_ids}
+        for enroll_id, type_note, note in (
+            models.Note.objects.filter(id_enroll_student__in=enroll_ids)
+            .values_list('id_enroll_student', 'type_note', 'note')
+            .iterator(chunk_size=chunk_size)
+        ):
+            notes_by_enroll[enroll_id][type_note] = note
+
+        for row in chunk:
+            student = dict(zip(STUDENT_COLUMNS, row))
+            yield student, attendance_by_enroll[row[0]], notes_by_enroll[row[0]]
+
+
+def class_dates(open_course):
+    """
+    Fechas de las columnas de asistencia: el calendario del curso más cualquier fecha con asistencia registrada fuera de él.
+    """
+    recorded = (
+        models.Attendance.objects.filter(id_enroll_student__id_open_course=open_course.id_open_course)
+        .values_list('date', flat=True)
+        .distinct()
+    )
+    return sorted(set(class_calendar.get_calendar(open_course).dates).union(recorded))
+
+
+def stream_csv(open_course):
+    dates = class_dates(open_course)
+    note_types = [value for value, _ in models.Note.TYPE_NOTE_CHOICES]
+    attendance_labels = dict(models.Attendance.ATTENDANCE_CHOICES)
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(STUDENT_COLUMNS + [day.isoformat() for day in dates] + note_types)
+    for student, attendance, notes in export_rows(open_course):
+        yield writer.writerow(
+            [student[column] for column in STUDENT_COLUMNS]
+            + [attendance_labels.get(attendance.get(day), '') for day in dates]
+            + [notes.get(type_note, '') for type_note in note_types]
+        )
+
+
+def stream_jsonl(open_course):
+    dates = class_dates(open_course)
+    note_types = [value for value, _ in models.Note.TYPE_NOTE_CHOICES]
+
+    for student, attendance, notes in export_rows(open_course):
+        yield json.dumps({
+            **student,
+            "attendance": {day.isoformat(): attendance.get(day) for day in dates},
+            "notes": {type_note: notes.get(type_note) for type_note in note_types},
+        }, ensure_ascii=False) + "\n"
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.crypto import salted_hmac
+from rest_framework.authtoken.models import Token
+from api import authentication
+
+
+# Login asíncrono de profesores y estudiantes.
+# La verificación de la contraseña (PBKDF2, lenta a propósito) corre en un pool de hilos acotado, por lo que una
+# ráfaga de logins no ocupa los workers que atienden al resto de endpoints. Antes de llegar al pool:
+# - un límite de intentos por IP y por email corta los ataques de fuerza bruta (429),
+# - los intentos fallidos recientes con la misma contraseña se responden desde la caché (caché negativa),
+# - los intentos idénticos que llegan a la vez comparten una sola verificación.
+# La caché se usa con su API asíncrona (aget, aadd, aincr...) para no bloquear el event loop con un backend de red.
+
+HASH_WORKERS = getattr(settings, 'LOGIN_HASH_WORKERS', 4)
+# Verificaciones en cola como máximo; por encima se responde 503 en lugar de acumular espera
+MAX_PENDING = getattr(settings, 'LOGIN_MAX_PENDING', 200)
+FAILED_ATTEMPT_TIMEOUT = 30
+THROTTLE_WINDOW = 60
+THROTTLE_RATES = {
+    'ip': getattr(settings, 'LOGIN_THROTTLE_PER_IP', 30),
+    'email': getattr(settings, 'LOGIN_THROTTLE_PER_EMAIL', 10),
+}
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='login-hash')
+_lock = threading.Lock()
+_pending = 0
+# Verificaciones en curso: clave del intento -> concurrent.futures.Future
+_in_flight = {}
+
+
+async def login(request, model, serializer_class, role):
+    """
+    Autentica al usuario del modelo indicado con email y password (JSON o formulario).
+    Retorna {"token": ..., role: datos serializados} como las vistas de login anteriores, más los tokens firmados
+    "access", "refresh" y "expires_in" (ver api.authentication).
+    """
+    data = _parse_body(request)
+    email = str(data.get('email') or '').strip()
+    password = str(data.get('password') or '')
+    if not email or not password:
+        return JsonResponse({"error": "Se requieren los campos 'email' y 'password'."}, status=400)
+
+    # Límite de intentos fallidos por IP y de intentos por email
+    ip = request.META.get('REMOTE_ADDR', '')
+    retry_after = await _throttle(ip, email.lower())
+    if retry_after:
+        response = JsonResponse({"error": "Demasiados intentos de inicio de sesión. Intente nuevamente más tarde."}, status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    # Intento fallido reciente con la misma contraseña: no se vuelve a verificar
+    attempt_key = _attempt_key(role, email, password)
+    if await cache.aget(attempt_key):
+        await _count_failure(ip)
+        return _invalid_credentials()
+
+    user = await model.objects.filter(email=email).afirst()
+    if user is None:
+        await _count_failure(ip)
+        return JsonResponse({"detail": f"No {model.__name__} matches the given query."}, status=404)
+
+    valid = await _verify(attempt_key, user, password)
+    if valid is None:
+        response = JsonResponse({"error": "Servidor ocupado. Intente nuevamente en unos segundos."}, status=503)
+        response['Retry-After'] = '1'
+        return response
+    if not valid:
+        await cache.aset(attempt_key, True, FAILED_ATTEMPT_TIMEOUT)
+        await _count_failure(ip)
+        return _invalid_credentials()
+
+    # Obtiene o crea el token de autenticación y emite además los tokens firmados (access/refresh)
+    token, created = await Token.objects.aget_or_create(user=user)
+    return JsonResponse({"token": token.key, role: serializer_class(instance=user).data, **authentication.issue_tokens(user, role)}, status=200)
+
+
+async def _verify(attempt_key, user, password):
+    """
+    Verifica la contraseña en el pool de hilos; los intentos idénticos concurrentes esperan la misma verificación.
+    Retorna None si la cola está llena.
+    Se comparten concurrent.futures.Future (no futures de asyncio) porque, según el middleware, cada petición
+    puede correr en su propio event loop.
+    """
+    global _pending
+    submitted = False
+    with _lock:
+        future = _in_flight.get(attempt_key)
+        if future is None:
+            if _pending >= MAX_PENDING:
+                return None
+            _pending += 1
+            future = _executor.submit(user.check_password, password)
+            _in_flight[attempt_key] = future
+            submitted = True
+    # Fuera del lock: si la verificación ya terminó, el callback corre de inmediato en este hilo
+    if submitted:
+        future.add_done_callback(lambda done: _release(attempt_key, done))
+    return await asyncio.wrap_future(future)
+
+
+def _release(attempt_key, future):
+    global _pending
+    with _lock:
+        _pending -= 1
+        if _in_flight.get(attempt_key) is future:
+            del _in_flight[attempt_key]
+
+
+async def _throttle(ip, email):
+    """
+    Retorna los segundos a esperar si se superó el límite en la ventana fija de THROTTLE_WINDOW segundos.
+    Por email se cuenta cada intento; por IP solo se consultan los intentos fallidos (ver _count_failure),
+    para que varios usuarios detrás de la misma IP puedan iniciar sesión normalmente.
+    """
+    if (await cache.aget(_throttle_key('ip', ip), 0)) >= THROTTLE_RATES['ip']:
+        return THROTTLE_WINDOW
+    if await _increment(_throttle_key('email', email)) > THROTTLE_RATES['email']:
+        return THROTTLE_WINDOW
+    return 0
+
+
+async def _count_failure(ip):
+    """
+    Cuenta un intento fallido (credenciales inválidas o email inexistente) para el límite por IP.
+    """
+    await _increment(_throttle_key('ip', ip))
+
+
+async def _increment(key):
+    """
+    Incrementa el contador de la ventana actual y retorna su valor.
+    """
+    if await cache.aadd(key, 1, THROTTLE_WINDOW):
+        return 1
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        # La clave expiró entre aadd y aincr
+        await cache.aadd(key, 1, THROTTLE_WINDOW)
+        return 1
+
+
+def _throttle_key(scope, value):
+    return f"login_throttle:{scope}:{value}"
+
+
+def _attempt_key(role, email, password):
+    # HMAC con SECRET_KEY: la caché nunca guarda la contraseña ni un hash rápido sin clave
+    digest = salted_hmac('api.login', f"{role}:{email.lower()}:{password}", algorithm='sha256').hexdigest()
+    return f"login_failed:{digest}"
+
+
+def _parse_body(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def _invalid_credentials():
+    return JsonResponse({"error": "Invalid username or password"}, status=400)
@@ -0,0 +1,53 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from api import semester_clone
+
+
+class Command(BaseCommand):
+    help = "Clona los cursos aperturados y sus horarios de un semestre (año y semestre académico) a otro."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source_year', type=int, help="Año académico de origen.")
+        parser.add_argument('source_semester', type=int, help="Semestre académico de origen.")
+        parser.add_argument('target_year', type=int, help="Año académico destino.")
+        parser.add_argument('target_semester', type=int, help="Semestre académico destino.")
+        parser.add_argument(
+            '--start-date',
+            type=date.fromisoformat,
+            help="Fecha (YYYY-MM-DD) en la que debe caer el primer inicio de clases; por defecto se desplazan los años.",
+        )
+        parser.add_argument(
+            '--professor',
+            type=int,
+            nargs='+',
+            dest='professor_ids',
+            help="Clona solo los cursos de los id_professor indicados.",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Muestra qué cursos se crearían y los conflictos sin escribir nada.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = semester_clone.clone_semester(
+                options['source_year'], options['source_semester'],
+                options['target_year'], options['target_semester'],
+                professor_ids=options['professor_ids'],
+                start_date=options['start_date'],
+                dry_run=options['dry_run'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for conflict in result['conflicts']:
+            self.stdout.write(self.style.WARNING(
+                f"Omitido id_open_course={conflict['source_open_course']} "
+                f"(profesor {conflict['id_professor']}, curso {conflict['id_course']}, sección {conflict['section']}): {conflict['reason']}"
+            ))
+
+        verb = "Se crearían" if options['dry_run'] else "Se crearon"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(result['created'])} cursos aperturados; {len(result['conflicts'])} omitidos por conflictos."
+        ))
@@ -0,0 +1,61 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from api import student_import
+
+
+class Command(BaseCommand):
+    help = "Registra estudiantes en lote desde un archivo CSV (con cabecera) o JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ruta del archivo con columnas email, password, first_name, last_name, phone, career y year_admission.")
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help="Formato del archivo; por defecto se deduce de la extensión.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=student_import.DEFAULT_BATCH_SIZE,
+            help=f"Cantidad de filas procesadas por lote (por defecto {student_import.DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help="Procesos para cifrar contraseñas (por defecto la cantidad de CPUs; 1 desactiva el pool).",
+        )
+        parser.add_argument(
+            '--errors',
+            dest='errors_path',
+            help="Ruta del CSV donde se escriben las filas rechazadas (line, email, error).",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or student_import.detect_format(options['path'])
+        errors_file = open(options['errors_path'], 'w', newline='', encoding='utf-8') if options['errors_path'] else None
+        error_writer = None
+        if errors_file is not None:
+            error_writer = csv.writer(errors_file)
+            error_writer.writerow(student_import.ERROR_FIELDS)
+
+        def progress(summary):
+            self.stdout.write(f"Procesadas {summary['processed']} filas: {summary['created']} creadas, {summary['errors']} con errores.")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                summary = student_import.import_students(
+                    stream, file_format,
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    error_writer=error_writer,
+                    progress=progress,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Se registraron {summary['created']} estudiantes; {summary['errors']} filas rechazadas."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from api import attendance_summary
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero la tabla AttendanceSummary a partir de las asistencias registradas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--enroll-student',
+            type=int,
+            nargs='+',
+            dest='enroll_ids',
+            help="Reconstruye solo los resúmenes de los id_enroll_student indicados.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Cantidad de inscripciones procesadas por lote (por defecto 1000).",
+        )
+
+    def handle(self, *args, **options):
+        written = attendance_summary.rebuild_summaries(options['enroll_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Se reconstruyeron {written} resúmenes de asistencia."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from api import seats
+
+
+class Command(BaseCommand):
+    help = "Recalcula el contador de inscritos (enrolled_count) de los cursos aperturados."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--open-course',
+            type=int,
+            nargs='+',
+            dest='open_course_ids',
+            help="Recalcula solo los id_open_course indicados.",
+        )
+
+    def handle(self, *args, **options):
+        updated = seats.recount(options['open_course_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Se recalcularon {updated} cursos aperturados."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_student_career_student_year_admission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id_enroll_student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_summary', serialize=False, to='api.enrollstudent')),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('last_class_date', models.DateField(blank=True, null=True)),
+                ('absence_percentage', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'AttendanceSummary',
+                'verbose_name_plural': 'AttendanceSummaries',
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:50
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import migrations, models
+
+
+def compute_existing_final_grades(apps, schema_editor):
+    # Calcula el promedio final (pesos iguales por defecto) de las inscripciones que ya tienen las tres notas;
+    # las que tienen notas pendientes quedan en null
+    EnrollStudent = apps.get_model('api', 'EnrollStudent')
+    Note = apps.get_model('api', 'Note')
+    types = ['Evaluación Parcial', 'Evaluación Final', 'Trabajos Académicos']
+
+    notes_by_enroll = defaultdict(dict)
+    for enroll_id, type_note, note in Note.objects.order_by('id_note').values_list('id_enroll_student', 'type_note', 'note'):
+        notes_by_enroll[enroll_id][type_note] = note
+
+    enrollments = [
+        EnrollStudent(
+            id_enroll_student=enroll_id,
+            final_grade=(Decimal(sum(notes[type_note] for type_note in types)) / len(types)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+        )
+        for enroll_id, notes in notes_by_enroll.items()
+        if all(type_note in notes for type_note in types)
+    ]
+    EnrollStudent.objects.bulk_update(enrollments, ['final_grade'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='weight_academic_work',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='weight_final_exam',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='weight_partial_exam',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='enrollstudent',
+            name='final_grade',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.RunPython(compute_existing_final_grades, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_enrollments(apps, schema_editor):
+    # Inicializa el contador de inscritos de cada curso aperturado con las inscripciones existentes
+    OpenCourse = apps.get_model('api', 'OpenCourse')
+    EnrollStudent = apps.get_model('api', 'EnrollStudent')
+    counts = EnrollStudent.objects.values('id_open_course').annotate(total=Count('id_enroll_student'))
+    open_courses = [OpenCourse(id_open_course=row['id_open_course'], enrolled_count=row['total']) for row in counts]
+    OpenCourse.objects.bulk_update(open_courses, ['enrolled_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_course_weight_academic_work_course_weight_final_exam_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opencourse',
+            name='capacity',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='opencourse',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Waitlist',
+            fields=[
+                ('id_waitlist', models.AutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id_open_course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='api.opencourse')),
+                ('id_student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.student')),
+            ],
+            options={
+                'verbose_name': 'Waitlist',
+                'verbose_name_plural': 'Waitlists',
+                'constraints': [models.UniqueConstraint(fields=('id_student', 'id_open_course'), name='unique_waitlist_per_open_course')],
+            },
+        ),
+        migrations.RunPython(count_existing_enrollments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_opencourse_capacity_opencourse_enrolled_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opencourse',
+            index=models.Index(fields=['id_professor', 'academic_year', 'academic_semester', 'section'], name='opencourse_prof_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opencourse',
+            index=models.Index(fields=['id_professor', 'professional_career'], name='opencourse_prof_career_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_opencourse_opencourse_prof_term_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['study_plan', 'study_cycle'], name='course_plan_cycle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['study_cycle'], name='course_cycle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['course_type', 'study_type'], name='course_type_idx'),
+        ),
+    ]
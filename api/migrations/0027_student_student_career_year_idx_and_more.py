@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_course_course_plan_cycle_idx_course_course_cycle_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['career', 'year_admission'], name='student_career_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['year_admission'], name='student_year_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:21
+
+import api.models
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_student_student_career_year_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='opencourse',
+            name='academic_year',
+            field=models.PositiveSmallIntegerField(default=api.models.current_year),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='year_admission',
+            field=models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1900), api.models.validate_not_future_year]),
+        ),
+    ]
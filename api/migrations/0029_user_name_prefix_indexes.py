@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+# Índices para los filtros por prefijo del directorio de estudiantes (name y email).
+# first_name, last_name y username son columnas de auth_user (Student hereda de User), por lo que no se pueden
+# declarar en Student.Meta.indexes y se crean según el motor:
+# - SQLite: startswith/istartswith se traducen a LIKE (sin distinguir mayúsculas), que solo usa índices NOCASE.
+# - PostgreSQL: istartswith se traduce a UPPER(col) LIKE UPPER(...), que necesita un índice funcional con
+#   text_pattern_ops; username__startswith ya usa el índice *_like (varchar_pattern_ops) que Django crea
+#   para las columnas únicas.
+INDEXES = {
+    'sqlite': [
+        ('auth_user_first_name_nocase_idx', 'auth_user (first_name COLLATE NOCASE)'),
+        ('auth_user_last_name_nocase_idx', 'auth_user (last_name COLLATE NOCASE)'),
+        ('auth_user_username_nocase_idx', 'auth_user (username COLLATE NOCASE)'),
+    ],
+    'postgresql': [
+        ('auth_user_upper_first_name_idx', 'auth_user (UPPER(first_name) text_pattern_ops)'),
+        ('auth_user_upper_last_name_idx', 'auth_user (UPPER(last_name) text_pattern_ops)'),
+    ],
+}
+
+
+def create_indexes(apps, schema_editor):
+    for name, definition in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+
+
+def drop_indexes(apps, schema_editor):
+    for name, _ in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_alter_opencourse_academic_year_and_more'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
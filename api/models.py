@@ -1,10 +1,22 @@
 from datetime import date
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.db import models
 from django.shortcuts import get_object_or_404
 import re
 
+
+def current_year():
+    # Se evalúa en cada uso (no al importar el módulo) para que las migraciones no fijen el año
+    return date.today().year
+
+
+def validate_not_future_year(value):
+    if value > current_year():
+        raise ValidationError(f"El año no puede ser posterior a {current_year()}.")
+
+
 class Professor(User):
     # username ! (email)
     # first_name
@@ -77,7 +89,7 @@ class Student(User):
     year_admission = models.PositiveSmallIntegerField(
         validators=[
             MinValueValidator(1900),
-            MaxValueValidator(date.today().year)
+            validate_not_future_year
         ]
     )
 
@@ -99,6 +111,11 @@ class Student(User):
     class Meta:
         verbose_name = "Student"
         verbose_name_plural = "Students"
+        indexes = [
+            # Filtros del directorio de estudiantes
+            models.Index(fields=['career', 'year_admission'], name='student_career_year_idx'),
+            models.Index(fields=['year_admission'], name='student_year_idx'),
+        ]
 
 
 class Course(models.Model):
@@ -162,15 +179,36 @@ class Course(models.Model):
         default="Especialidad"
     )
 
+    # Pesos de cada tipo de nota (Note.TYPE_NOTE_CHOICES) en el promedio final de las inscripciones
+    weight_partial_exam = models.PositiveSmallIntegerField(default=1)
+    weight_final_exam = models.PositiveSmallIntegerField(default=1)
+    weight_academic_work = models.PositiveSmallIntegerField(default=1)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Campo de peso correspondiente a cada tipo de nota
+    NOTE_WEIGHT_FIELDS = {
+        'Evaluación Parcial': 'weight_partial_exam',
+        'Evaluación Final': 'weight_final_exam',
+        'Trabajos Académicos': 'weight_academic_work',
+    }
+
+    def note_weights(self):
+        return {type_note: getattr(self, field) for type_note, field in self.NOTE_WEIGHT_FIELDS.items()}
+
     def __str__(self):
         return self.name
 
     class Meta:
         verbose_name = "Course"
         verbose_name_plural = "Courses"
+        indexes = [
+            # Filtros del catálogo de cursos
+            models.Index(fields=['study_plan', 'study_cycle'], name='course_plan_cycle_idx'),
+            models.Index(fields=['study_cycle'], name='course_cycle_idx'),
+            models.Index(fields=['course_type', 'study_type'], name='course_type_idx'),
+        ]
 
 
 class OpenCourse(models.Model):
@@ -195,7 +233,7 @@ class OpenCourse(models.Model):
     end_class = models.DateField()
     
     academic_year = models.PositiveSmallIntegerField(
-        default=date.today().year
+        default=current_year
     )
     academic_semester = models.SmallIntegerField(
         validators=[
@@ -213,6 +251,10 @@ class OpenCourse(models.Model):
         default='A'
     )
 
+    # Vacantes de la sección (null = sin límite) y contador de inscritos mantenido por api.seats
+    capacity = models.PositiveSmallIntegerField(null=True, blank=True)
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -222,6 +264,11 @@ class OpenCourse(models.Model):
     class Meta:
         verbose_name = "OpenCourse"
         verbose_name_plural = "OpenCourses"
+        indexes = [
+            # Listados y filtros de los cursos aperturados de un profesor
+            models.Index(fields=['id_professor', 'academic_year', 'academic_semester', 'section'], name='opencourse_prof_term_idx'),
+            models.Index(fields=['id_professor', 'professional_career'], name='opencourse_prof_career_idx'),
+        ]
 
 
 class Schedule(models.Model):
@@ -263,6 +310,9 @@ class EnrollStudent(models.Model):
     id_student = models.ForeignKey(Student, on_delete=models.CASCADE)
     id_open_course = models.ForeignKey(OpenCourse, on_delete=models.CASCADE)
 
+    # Promedio final ponderado según los pesos del curso; se recalcula al guardar o eliminar una nota
+    final_grade = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -274,6 +324,26 @@ class EnrollStudent(models.Model):
         verbose_name_plural = "EnrollStudents"
 
 
+class Waitlist(models.Model):
+    id_waitlist = models.AutoField(primary_key=True)
+
+    id_student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    id_open_course = models.ForeignKey(OpenCourse, on_delete=models.CASCADE, related_name='waitlist')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.id_student} | {self.id_open_course} (en espera)"
+
+    class Meta:
+        verbose_name = "Waitlist"
+        verbose_name_plural = "Waitlists"
+        constraints = [
+            models.UniqueConstraint(fields=['id_student', 'id_open_course'], name='unique_waitlist_per_open_course'),
+        ]
+
+
 class Attendance(models.Model):
     ATTENDANCE_CHOICES = [
         (0, 'Presente'),
@@ -333,3 +403,39 @@ class Note(models.Model):
         verbose_name = "Note"
         verbose_name_plural = "Notes"
 
+
+
+class AttendanceSummary(models.Model):
+    # Campo del resumen que acumula cada valor de Attendance.ATTENDANCE_CHOICES
+    COUNT_FIELDS = {
+        0: 'present_count',
+        1: 'absent_count',
+        2: 'late_count',
+    }
+
+    id_enroll_student = models.OneToOneField(
+        EnrollStudent,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='attendance_summary'
+    )
+
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    last_class_date = models.DateField(null=True, blank=True)
+    absence_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def total_count(self):
+        return self.present_count + self.absent_count + self.late_count
+
+    def __str__(self):
+        return f"{self.id_enroll_student} | {self.absence_percentage}%"
+
+    class Meta:
+        verbose_name = "AttendanceSummary"
+        verbose_name_plural = "AttendanceSummaries"
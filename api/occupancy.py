@@ -0,0 +1,116 @@
+from django.core.cache import cache
+from api import models, cache_versions
+
+
+# Ocupación semanal de un profesor en un semestre.
+# Cada día de la semana es un entero de Python usado como mapa de bits: el bit i representa el bloque de
+# RESOLUTION_MINUTES minutos que empieza en el minuto i * RESOLUTION_MINUTES del día. Saber si un horario
+# se cruza con la ocupación del profesor es un AND entre dos enteros, sin comparar horarios de a pares.
+
+RESOLUTION_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // RESOLUTION_MINUTES
+CACHE_TIMEOUT = 60 * 60
+
+
+class WeeklyOccupancy:
+    def __init__(self, days=None):
+        self.days = list(days) if days is not None else [0] * 7
+
+    @classmethod
+    def from_schedules(cls, schedules):
+        """
+        schedules: iterable de (day_week, start_hour, end_hour).
+        """
+        occupancy = cls()
+        for day_week, start_hour, end_hour in schedules:
+            occupancy.add(day_week, start_hour, end_hour)
+        return occupancy
+
+    def add(self, day_week, start_hour, end_hour):
+        self.days[day_week] |= slot_mask(start_hour, end_hour)
+
+    def collides(self, day_week, start_hour, end_hour):
+        return bool(self.days[day_week] & slot_mask(start_hour, end_hour))
+
+    def busy_intervals(self, day_week):
+        """
+        Retorna los intervalos ocupados del día como [(inicio, fin)] en formato HH:MM, unificando los contiguos.
+        """
+        bits = self.days[day_week]
+        intervals = []
+        slot = 0
+        while bits:
+            # Salta los bloques libres y mide el tramo ocupado siguiente
+            free = (bits & -bits).bit_length() - 1
+            bits >>= free
+            slot += free
+            busy = (~bits & (bits + 1)).bit_length() - 1
+            intervals.append((_format_slot(slot), _format_slot(slot + busy)))
+            bits >>= busy
+            slot += busy
+        return intervals
+
+
+def slot_mask(start_hour, end_hour):
+    """
+    Máscara de bits de los bloques que cubre [start_hour, end_hour). Los extremos que no caen en el límite
+    de un bloque se redondean hacia afuera, por lo que el cruce se detecta de forma conservadora.
+    """
+    first = (start_hour.hour * 60 + start_hour.minute) // RESOLUTION_MINUTES
+    last = min(-(-_seconds(end_hour) // (RESOLUTION_MINUTES * 60)), SLOTS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def get_occupancy(id_professor, academic_year, academic_semester):
+    """
+    Ocupación semanal del profesor en el semestre indicado, guardada en caché hasta que cambie
+    alguno de sus cursos aperturados u horarios.
+    """
+    key = cache_versions.versioned_key(_namespace(id_professor), academic_year, academic_semester)
+    days = cache.get(key)
+    if days is None:
+        days = build_occupancy(id_professor, academic_year, academic_semester).days
+        cache.set(key, days, CACHE_TIMEOUT)
+    return WeeklyOccupancy(days)
+
+
+def build_occupancy(id_professor, academic_year, academic_semester):
+    schedules = models.Schedule.objects.filter(
+        id_open_course__id_professor=id_professor,
+        id_open_course__academic_year=academic_year,
+        id_open_course__academic_semester=academic_semester,
+    ).values_list('day_week', 'start_hour', 'end_hour')
+    return WeeklyOccupancy.from_schedules(schedules)
+
+
+def find_collisions(occupancy, schedule_items):
+    """
+    Retorna los horarios de schedule_items (dicts con day_week, start_hour y end_hour) que se cruzan con la
+    ocupación del profesor o con otro horario de la misma lista.
+    """
+    pending = WeeklyOccupancy(occupancy.days)
+    collisions = []
+    for item in schedule_items:
+        if pending.collides(item['day_week'], item['start_hour'], item['end_hour']):
+            collisions.append(item)
+        pending.add(item['day_week'], item['start_hour'], item['end_hour'])
+    return collisions
+
+
+def invalidate(id_professor):
+    cache_versions.bump_version(_namespace(id_professor))
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second + (1 if value.microsecond else 0)
+
+
+def _format_slot(slot):
+    minutes = slot * RESOLUTION_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _namespace(id_professor):
+    return f"occupancy:professor:{id_professor}"
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+# Paginación por cursor para los listados que crecen con el tiempo.
+# Es opcional: las vistas solo paginan si se envía ?cursor=... o ?page_size=..., así los clientes actuales
+# siguen recibiendo la lista completa. El cursor evita el OFFSET, por lo que pedir la página N cuesta lo mismo que la primera.
+
+
+class OptionalCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def is_requested(self, request):
+        return self.cursor_query_param in request.query_params or self.page_size_query_param in request.query_params
+
+
+class OpenCourseCursorPagination(OptionalCursorPagination):
+    # Los más recientes primero; id_open_course es único y no cambia, como exige el cursor
+    ordering = '-id_open_course'
+
+
+class StudentCursorPagination(OptionalCursorPagination):
+    ordering = 'id_student'
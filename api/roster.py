@@ -0,0 +1,80 @@
+from django.db.models import Prefetch
+from api import models, serializers
+
+
+# Consultas compartidas para listar inscripciones (matrículas) con sus relaciones ya cargadas.
+# Todas usan select_related/prefetch_related, por lo que la cantidad de consultas no depende del tamaño de la sección.
+
+
+def course_enrollments(id_open_course):
+    """
+    Inscripciones de un curso aperturado con el estudiante cargado en el mismo join (1 consulta).
+    """
+    return (
+        models.EnrollStudent.objects.filter(id_open_course=id_open_course)
+        .select_related('id_student')
+        .order_by('id_enroll_student')
+    )
+
+
+def course_enrollments_with_attendance(id_open_course):
+    """
+    Inscripciones de un curso aperturado con el estudiante y sus asistencias ordenadas por fecha (2 consultas).
+    """
+    return course_enrollments(id_open_course).prefetch_related(
+        Prefetch('attendance_set', queryset=models.Attendance.objects.order_by('date', 'id_attendance'))
+    )
+
+
+def course_enrollments_with_notes(id_open_course):
+    """
+    Inscripciones de un curso aperturado con el estudiante y sus notas (2 consultas).
+    """
+    return course_enrollments(id_open_course).prefetch_related(
+        Prefetch('note_set', queryset=models.Note.objects.order_by('id_note'))
+    )
+
+
+def student_enrollments(id_student):
+    """
+    Inscripciones de un estudiante con el curso aperturado, el profesor y el curso en un solo join (1 consulta).
+    """
+    return (
+        models.EnrollStudent.objects.filter(id_student=id_student)
+        .select_related('id_open_course__id_professor', 'id_open_course__id_course')
+        .order_by('id_enroll_student')
+    )
+
+
+def enrollment_detail(enrollment):
+    """
+    Inscripción enriquecida con los datos del curso aperturado, el profesor y el curso.
+    Requiere que la inscripción venga de student_enrollments() para no generar consultas adicionales.
+    """
+    open_course = enrollment.id_open_course
+    professor = open_course.id_professor if open_course else None
+    course = open_course.id_course if open_course else None
+
+    return {
+        "id_enroll_student": enrollment.id_enroll_student,
+        "id_student": enrollment.id_student_id,
+        "open_course": serializers.OpenCourseSerializer(open_course).data if open_course else None,
+        "professor": serializers.ProfessorSerializer(professor).data if professor else None,
+        "course": serializers.CourseSerializer(course).data if course else None,
+        "academic_year": open_course.academic_year if open_course else None,
+        "academic_semester": open_course.academic_semester if open_course else None,
+        "section": open_course.section if open_course else None,
+        "created_at": enrollment.created_at,
+        "updated_at": enrollment.updated_at,
+    }
+
+
+def roster_entry(enrollment):
+    """
+    Inscripción serializada con el objeto 'student' en lugar del campo id_student.
+    Requiere que la inscripción venga de course_enrollments() para no generar consultas adicionales.
+    """
+    enrollment_data = serializers.EnrollStudentSerializer(enrollment).data
+    enrollment_data["student"] = serializers.StudentSerializer(enrollment.id_student).data
+    enrollment_data.pop("id_student", None)
+    return enrollment_data
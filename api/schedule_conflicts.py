@@ -0,0 +1,135 @@
+from bisect import bisect_left
+from collections import defaultdict
+from api import models
+
+
+# Detección de cruces de horario de los estudiantes.
+# WeeklySlotIndex guarda los bloques semanales ocupados de un estudiante ordenados por hora de inicio en cada día,
+# junto con el máximo acumulado de las horas de fin: así saber si un bloque se cruza cuesta una búsqueda binaria.
+
+
+class WeeklySlotIndex:
+    def __init__(self, slots=()):
+        """
+        slots: iterable de (day_week, start_hour, end_hour, id_open_course).
+        """
+        by_day = defaultdict(list)
+        for day_week, start_hour, end_hour, id_open_course in slots:
+            by_day[day_week].append((start_hour, end_hour, id_open_course))
+
+        self._starts = {}
+        self._slots = {}
+        self._max_end = {}
+        for day_week, day_slots in by_day.items():
+            day_slots.sort()
+            max_end = []
+            for _, end_hour, _ in day_slots:
+                max_end.append(end_hour if not max_end or end_hour > max_end[-1] else max_end[-1])
+            self._starts[day_week] = [start_hour for start_hour, _, _ in day_slots]
+            self._slots[day_week] = day_slots
+            self._max_end[day_week] = max_end
+
+    def overlaps(self, day_week, start_hour, end_hour, ignore_open_course=None):
+        """
+        Retorna los bloques (start_hour, end_hour, id_open_course) que se cruzan con [start_hour, end_hour).
+        Si no hay cruce la respuesta se obtiene en O(log n); solo se recorren los bloques cuando sí lo hay.
+        """
+        starts = self._starts.get(day_week)
+        if not starts:
+            return []
+        # Los bloques [0, index) empiezan antes de que termine el bloque consultado
+        index = bisect_left(starts, end_hour)
+        if index == 0 or self._max_end[day_week][index - 1] <= start_hour:
+            return []
+        return [
+            slot for slot in self._slots[day_week][:index]
+            if slot[1] > start_hour and slot[2] != ignore_open_course
+        ]
+
+
+def student_indexes(student_ids, academic_year, academic_semester, exclude_open_course=None):
+    """
+    Construye {id_student: WeeklySlotIndex} con los horarios de los cursos en los que cada estudiante
+    está inscrito en el semestre indicado, usando una sola consulta.
+    """
+    rows = models.Schedule.objects.filter(
+        id_open_course__enrollstudent__id_student__in=list(student_ids),
+        id_open_course__academic_year=academic_year,
+        id_open_course__academic_semester=academic_semester,
+    )
+    if exclude_open_course is not None:
+        rows = rows.exclude(id_open_course=exclude_open_course)
+
+    slots = defaultdict(list)
+    for id_student, day_week, start_hour, end_hour, id_open_course in rows.values_list(
+        'id_open_course__enrollstudent__id_student', 'day_week', 'start_hour', 'end_hour', 'id_open_course'
+    ):
+        slots[id_student].append((day_week, start_hour, end_hour, id_open_course))
+    return {id_student: WeeklySlotIndex(slots.get(id_student, ())) for id_student in student_ids}
+
+
+def enrollment_conflicts(open_course, student_ids):
+    """
+    Retorna {id_student: [cruces]} para los estudiantes cuyo horario se cruza con el del curso aperturado
+    en el mismo semestre. Usa dos consultas sin importar la cantidad de estudiantes.
+    """
+    schedules = list(
+        models.Schedule.objects.filter(id_open_course=open_course.id_open_course)
+        .values_list('day_week', 'start_hour', 'end_hour')
+    )
+    if not schedules:
+        return {}
+
+    indexes = student_indexes(student_ids, open_course.academic_year, open_course.academic_semester, exclude_open_course=open_course.id_open_course)
+    conflicts = {}
+    for id_student, index in indexes.items():
+        found = []
+        for day_week, start_hour, end_hour in schedules:
+            for other_start, other_end, other_open_course in index.overlaps(day_week, start_hour, end_hour):
+                found.append(_conflict(open_course.id_open_course, day_week, start_hour, end_hour, other_open_course, other_start, other_end))
+        if found:
+            conflicts[id_student] = found
+    return conflicts
+
+
+def student_report(id_student, academic_year=None, academic_semester=None):
+    """
+    Lista los cruces de horario entre los cursos en los que el estudiante está inscrito, agrupados por semestre.
+    """
+    rows = models.Schedule.objects.filter(id_open_course__enrollstudent__id_student=id_student)
+    if academic_year is not None:
+        rows = rows.filter(id_open_course__academic_year=academic_year)
+    if academic_semester is not None:
+        rows = rows.filter(id_open_course__academic_semester=academic_semester)
+
+    slots_by_semester = defaultdict(list)
+    for year, semester, day_week, start_hour, end_hour, id_open_course in rows.values_list(
+        'id_open_course__academic_year', 'id_open_course__academic_semester', 'day_week', 'start_hour', 'end_hour', 'id_open_course'
+    ):
+        slots_by_semester[(year, semester)].append((day_week, start_hour, end_hour, id_open_course))
+
+    report = []
+    for (year, semester), slots in sorted(slots_by_semester.items()):
+        index = WeeklySlotIndex(slots)
+        conflicts = []
+        for day_week, start_hour, end_hour, id_open_course in slots:
+            for other_start, other_end, other_open_course in index.overlaps(day_week, start_hour, end_hour, ignore_open_course=id_open_course):
+                # Cada par se reporta una sola vez
+                if (start_hour, id_open_course) < (other_start, other_open_course):
+                    conflicts.append(_conflict(id_open_course, day_week, start_hour, end_hour, other_open_course, other_start, other_end))
+        report.append({"academic_year": year, "academic_semester": semester, "conflicts": conflicts})
+    return report
+
+
+def _conflict(id_open_course, day_week, start_hour, end_hour, other_open_course, other_start, other_end):
+    return {
+        "id_open_course": id_open_course,
+        "day_week": day_week,
+        "start_hour": start_hour,
+        "end_hour": end_hour,
+        "conflicts_with": {
+            "id_open_course": other_open_course,
+            "start_hour": other_start,
+            "end_hour": other_end,
+        },
+    }
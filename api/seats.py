@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+from api import models, schedule_conflicts
+
+
+# Asignación de vacantes de los cursos aperturados.
+# OpenCourse.enrolled_count se actualiza con UPDATE condicionales (atómicos en la base de datos), por lo que
+# las inscripciones concurrentes no pueden superar la capacidad y nunca se necesita un COUNT(*) de EnrollStudent.
+# Las reservas deben hacerse dentro de la misma transacción que crea la inscripción: si esta falla, la vacante se libera.
+# Las eliminaciones de inscripciones descuentan el contador desde la señal post_delete de EnrollStudent.
+
+
+def reserve_seat(id_open_course):
+    """
+    Intenta ocupar una vacante; retorna True si la obtuvo.
+    """
+    has_room = Q(capacity__isnull=True) | Q(enrolled_count__lt=F('capacity'))
+    return models.OpenCourse.objects.filter(Q(id_open_course=id_open_course) & has_room).update(
+        enrolled_count=F('enrolled_count') + 1
+    ) == 1
+
+
+def reserve_seats(id_open_course, requested):
+    """
+    Intenta ocupar 'requested' vacantes; retorna cuántas se obtuvieron (puede ser menos que las pedidas).
+    """
+    if requested <= 0:
+        return 0
+    with transaction.atomic():
+        open_course = (
+            models.OpenCourse.objects.select_for_update()
+            .only('capacity', 'enrolled_count')
+            .get(id_open_course=id_open_course)
+        )
+        if open_course.capacity is None:
+            granted = requested
+        else:
+            granted = max(min(requested, open_course.capacity - open_course.enrolled_count), 0)
+        if granted:
+            models.OpenCourse.objects.filter(id_open_course=id_open_course).update(enrolled_count=F('enrolled_count') + granted)
+    return granted
+
+
+def release_seat(id_open_course):
+    models.OpenCourse.objects.filter(id_open_course=id_open_course, enrolled_count__gt=0).update(
+        enrolled_count=F('enrolled_count') - 1
+    )
+
+
+def add_to_waitlist(id_open_course, id_student):
+    """
+    Agrega al estudiante a la lista de espera (si no estaba) y retorna su posición.
+    """
+    entry, _ = models.Waitlist.objects.get_or_create(id_open_course_id=id_open_course, id_student_id=id_student)
+    return waitlist_position(entry)
+
+
+def waitlist_position(entry):
+    return models.Waitlist.objects.filter(id_open_course=entry.id_open_course_id, id_waitlist__lte=entry.id_waitlist).count()
+
+
+def promote_from_waitlist(id_open_course):
+    """
+    Inscribe al primer estudiante de la lista de espera que pueda ocupar una vacante libre, con las mismas
+    validaciones de la inscripción: las entradas de estudiantes que ya están inscritos se descartan y los que
+    tienen cruce de horario siguen esperando (se pasa al siguiente).
+    Retorna la inscripción creada o None.
+    """
+    with transaction.atomic():
+        entries = list(
+            models.Waitlist.objects.select_for_update(skip_locked=True)
+            .filter(id_open_course=id_open_course)
+            .order_by('id_waitlist')
+        )
+        if not entries:
+            return None
+
+        student_ids = [entry.id_student_id for entry in entries]
+        enrolled = set(
+            models.EnrollStudent.objects.filter(id_open_course=id_open_course, id_student__in=student_ids)
+            .values_list('id_student', flat=True)
+        )
+        if enrolled:
+            models.Waitlist.objects.filter(id_waitlist__in=[entry.id_waitlist for entry in entries if entry.id_student_id in enrolled]).delete()
+
+        open_course = models.OpenCourse.objects.get(id_open_course=id_open_course)
+        pending = [id_student for id_student in student_ids if id_student not in enrolled]
+        conflicts = schedule_conflicts.enrollment_conflicts(open_course, pending) if pending else {}
+        entry = next((entry for entry in entries if entry.id_student_id not in enrolled and entry.id_student_id not in conflicts), None)
+        if entry is None or not reserve_seat(id_open_course):
+            return None
+        enrollment = models.EnrollStudent.objects.create(id_student_id=entry.id_student_id, id_open_course_id=id_open_course)
+        entry.delete()
+    return enrollment
+
+
+def recount(open_course_ids=None):
+    """
+    Recalcula enrolled_count desde EnrollStudent (para corregir cambios hechos fuera de la API).
+    """
+    open_courses = models.OpenCourse.objects.all()
+    if open_course_ids is not None:
+        open_courses = open_courses.filter(id_open_course__in=list(open_course_ids))
+    counted = open_courses.annotate(total=Count('enrollstudent')).values_list('id_open_course', 'total')
+    updates = [models.OpenCourse(id_open_course=id_open_course, enrolled_count=total) for id_open_course, total in counted]
+    models.OpenCourse.objects.bulk_update(updates, ['enrolled_count'], batch_size=500)
+    return len(updates)
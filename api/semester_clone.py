@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import date
+from django.db import transaction
+from api import models, occupancy
+
+
+# Copia de los cursos aperturados (y sus horarios) de un semestre a otro.
+# Se leen los cursos y horarios de origen y la ocupación del semestre destino con tres consultas, se detectan los
+# conflictos en memoria y se escribe todo con dos bulk_create dentro de una sola transacción.
+
+OPEN_COURSE_FIELDS = (
+    'id_open_course', 'id_professor', 'id_course', 'start_class', 'end_class',
+    'professional_career', 'section', 'capacity',
+)
+
+
+def clone_semester(source_year, source_semester, target_year, target_semester,
+                   professor_ids=None, start_date=None, dry_run=False):
+    """
+    Clona los cursos aperturados de (source_year, source_semester) en (target_year, target_semester).
+    Las fechas se desplazan (target_year - source_year) años o, si se indica start_date, los días necesarios
+    para que el primer inicio de clases del semestre origen caiga en start_date.
+    Se omiten los cursos que ya existen en el destino (mismo profesor, curso, carrera y sección) y los que
+    cruzarían horarios del profesor. Con dry_run=True no se escribe nada y solo se reportan los resultados.
+    Retorna {"created": [...], "conflicts": [...]}.
+    """
+    if (source_year, source_semester) == (target_year, target_semester):
+        raise ValueError("El semestre destino debe ser distinto del semestre origen.")
+
+    source = models.OpenCourse.objects.filter(academic_year=source_year, academic_semester=source_semester)
+    target = models.OpenCourse.objects.filter(academic_year=target_year, academic_semester=target_semester)
+    if professor_ids is not None:
+        source = source.filter(id_professor__in=list(professor_ids))
+        target = target.filter(id_professor__in=list(professor_ids))
+
+    # Consulta 1: cursos aperturados de origen
+    source_courses = list(source.order_by('id_open_course').values(*OPEN_COURSE_FIELDS))
+    if not source_courses:
+        return {"created": [], "conflicts": []}
+
+    # Consulta 2: horarios de origen agrupados por curso aperturado
+    source_schedules = defaultdict(list)
+    for id_open_course, day_week, start_hour, end_hour in models.Schedule.objects.filter(
+        id_open_course__in=source
+    ).order_by('id_schedule').values_list('id_open_course', 'day_week', 'start_hour', 'end_hour'):
+        source_schedules[id_open_course].append({"day_week": day_week, "start_hour": start_hour, "end_hour": end_hour})
+
+    # Consulta 3: cursos y horarios que ya existen en el semestre destino
+    professor_ids = {course['id_professor'] for course in source_courses}
+    existing = set(target.values_list('id_professor', 'id_course', 'professional_career', 'section'))
+    busy = defaultdict(occupancy.WeeklyOccupancy)
+    for id_professor, day_week, start_hour, end_hour in models.Schedule.objects.filter(
+        id_open_course__academic_year=target_year,
+        id_open_course__academic_semester=target_semester,
+        id_open_course__id_professor__in=professor_ids,
+    ).values_list('id_open_course__id_professor', 'day_week', 'start_hour', 'end_hour'):
+        busy[id_professor].add(day_week, start_hour, end_hour)
+
+    shift = _date_shift(source_courses, source_year, target_year, start_date)
+
+    created = []
+    conflicts = []
+    for course in source_courses:
+        key = (course['id_professor'], course['id_course'], course['professional_career'], course['section'])
+        if key in existing:
+            conflicts.append(_conflict(course, "already_exists"))
+            continue
+        schedules = source_schedules.get(course['id_open_course'], [])
+        collisions = occupancy.find_collisions(busy[course['id_professor']], schedules)
+        if collisions:
+            conflicts.append(_conflict(course, "schedule_clash", collisions))
+            continue
+
+        # El curso se acepta: sus horarios pasan a ocupar la semana del profesor para los siguientes cursos
+        for item in schedules:
+            busy[course['id_professor']].add(item['day_week'], item['start_hour'], item['end_hour'])
+        existing.add(key)
+        created.append((course, schedules))
+
+    if not dry_run and created:
+        _write(created, target_year, target_semester, shift)
+        for id_professor in {course['id_professor'] for course, _ in created}:
+            occupancy.invalidate(id_professor)
+
+    return {
+        "created": [
+            {
+                "source_open_course": course['id_open_course'],
+                "id_open_course": course.get('new_id_open_course'),
+                "id_professor": course['id_professor'],
+                "id_course": course['id_course'],
+                "section": course['section'],
+                "start_class": shift(course['start_class']),
+                "end_class": shift(course['end_class']),
+                "schedules": len(schedules),
+            }
+            for course, schedules in created
+        ],
+        "conflicts": conflicts,
+    }
+
+
+def _write(created, target_year, target_semester, shift):
+    with transaction.atomic():
+        new_courses = models.OpenCourse.objects.bulk_create([
+            models.OpenCourse(
+                id_professor_id=course['id_professor'],
+                id_course_id=course['id_course'],
+                start_class=shift(course['start_class']),
+                end_class=shift(course['end_class']),
+                academic_year=target_year,
+                academic_semester=target_semester,
+                professional_career=course['professional_career'],
+                section=course['section'],
+                capacity=course['capacity'],
+            )
+            for course, _ in created
+        ], batch_size=500)
+
+        new_schedules = []
+        for (course, schedules), new_course in zip(created, new_courses):
+            course['new_id_open_course'] = new_course.id_open_course
+            new_schedules.extend(models.Schedule(id_open_course=new_course, **item) for item in schedules)
+        models.Schedule.objects.bulk_create(new_schedules, batch_size=1000)
+
+
+def _date_shift(source_courses, source_year, target_year, start_date):
+    """
+    Retorna la función que convierte una fecha del semestre origen en la del semestre destino.
+    """
+    if start_date is not None:
+        delta = start_date - min(course['start_class'] for course in source_courses)
+        return lambda value: value + delta
+
+    years = target_year - source_year
+
+    def shift_years(value):
+        try:
+            return value.replace(year=value.year + years)
+        except ValueError:
+            # 29 de febrero en un año no bisiesto
+            return date(value.year + years, 2, 28)
+    return shift_years
+
+
+def _conflict(course, reason, collisions=()):
+    return {
+        "source_open_course": course['id_open_course'],
+        "id_professor": course['id_professor'],
+        "id_course": course['id_course'],
+        "section": course['section'],
+        "reason": reason,
+        "collisions": [
+            {"day_week": item['day_week'], "start_hour": item['start_hour'], "end_hour": item['end_hour']}
+            for item in collisions
+        ],
+    }
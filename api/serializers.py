@@ -44,6 +44,9 @@ class CourseSerializer(serializers.ModelSerializer):
             'practice_hours',
             'study_plan',
             'subject_code',
+            'weight_partial_exam',
+            'weight_final_exam',
+            'weight_academic_work',
         ]
 
 class OpenCourseSerializer(serializers.ModelSerializer):
@@ -59,9 +62,12 @@ class OpenCourseSerializer(serializers.ModelSerializer):
             'academic_semester',
             'professional_career',
             'section',
+            'capacity',
+            'enrolled_count',
             'created_at',
             'updated_at',
         ]
+        read_only_fields = ['enrolled_count']
 
 class ScheduleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -76,6 +82,11 @@ class ScheduleSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
+# Horario recibido al crear un curso aperturado: el curso aún no existe, por eso id_open_course es de solo lectura
+class ScheduleItemSerializer(ScheduleSerializer):
+    class Meta(ScheduleSerializer.Meta):
+        read_only_fields = ['id_open_course']
+
 class EnrollStudentSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.EnrollStudent
@@ -83,9 +94,11 @@ class EnrollStudentSerializer(serializers.ModelSerializer):
             'id_enroll_student',
             'id_student',
             'id_open_course',
+            'final_grade',
             'created_at',
             'updated_at',
         ]
+        read_only_fields = ['final_grade']
 
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -110,3 +123,19 @@ class NoteSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
+
+class AttendanceSummarySerializer(serializers.ModelSerializer):
+    total_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = models.AttendanceSummary
+        fields = [
+            'id_enroll_student',
+            'present_count',
+            'absent_count',
+            'late_count',
+            'total_count',
+            'last_class_date',
+            'absence_percentage',
+            'updated_at',
+        ]
@@ -0,0 +1,175 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from api import models
+from api import attendance_summary, class_calendar, final_grade, grade_stats, transcript, seats, occupancy, course_catalog
+
+
+# Guarda el valor anterior de la asistencia para poder descontarlo del resumen al modificarla
+@receiver(pre_save, sender=models.Attendance)
+def remember_previous_attendance(sender, instance, raw=False, **kwargs):
+    instance._previous_attendance = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_attendance = (
+        models.Attendance.objects.filter(pk=instance.pk)
+        .values_list('id_enroll_student', 'date', 'attendance')
+        .first()
+    )
+
+
+# Mantiene AttendanceSummary al crear o modificar una asistencia
+@receiver(post_save, sender=models.Attendance)
+def update_summary_on_attendance_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_attendance', None)
+    attendance_summary.apply_attendance_changes(added=[instance], removed=[previous] if previous else [])
+
+
+# Mantiene AttendanceSummary al eliminar una asistencia.
+# Si la eliminación viene en cascada (p. ej. al borrar la inscripción) el resumen se elimina junto con ella.
+@receiver(post_delete, sender=models.Attendance)
+def update_summary_on_attendance_delete(sender, instance, origin=None, **kwargs):
+    if not (isinstance(origin, models.Attendance) or getattr(origin, 'model', None) is models.Attendance):
+        return
+    attendance_summary.apply_attendance_changes(removed=[instance])
+
+
+# Crea el resumen de asistencia (en cero) de cada inscripción nueva, para que las lecturas no escriban
+@receiver(post_save, sender=models.EnrollStudent)
+def create_summary_on_enrollment(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    attendance_summary.create_empty_summaries([instance.id_enroll_student])
+
+
+# Invalida el calendario de clases cuando cambian los horarios o las fechas del curso aperturado
+@receiver(post_save, sender=models.Schedule)
+@receiver(post_delete, sender=models.Schedule)
+def invalidate_calendar_on_schedule_change(sender, instance, **kwargs):
+    class_calendar.invalidate(instance.id_open_course_id)
+
+
+@receiver(post_save, sender=models.OpenCourse)
+@receiver(post_delete, sender=models.OpenCourse)
+def invalidate_calendar_on_opencourse_change(sender, instance, **kwargs):
+    class_calendar.invalidate(instance.id_open_course)
+
+
+# Invalida la ocupación semanal del profesor cuando cambian sus horarios o sus cursos aperturados
+@receiver(post_save, sender=models.Schedule)
+@receiver(post_delete, sender=models.Schedule)
+def invalidate_occupancy_on_schedule_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    id_professor = models.OpenCourse.objects.filter(id_open_course=instance.id_open_course_id).values_list('id_professor', flat=True).first()
+    if id_professor is not None:
+        occupancy.invalidate(id_professor)
+
+
+@receiver(pre_save, sender=models.OpenCourse)
+def remember_previous_professor(sender, instance, raw=False, **kwargs):
+    instance._previous_professor = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_professor = (
+        models.OpenCourse.objects.filter(pk=instance.pk).values_list('id_professor', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=models.OpenCourse)
+@receiver(post_delete, sender=models.OpenCourse)
+def invalidate_occupancy_on_opencourse_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    occupancy.invalidate(instance.id_professor_id)
+    previous = getattr(instance, '_previous_professor', None)
+    if previous is not None and previous != instance.id_professor_id:
+        occupancy.invalidate(previous)
+
+
+# Recalcula el promedio final de la inscripción al guardar o eliminar una de sus notas
+# e invalida las estadísticas en caché de su curso
+@receiver(post_save, sender=models.Note)
+def update_final_grade_on_note_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    final_grade.recompute_final_grades([instance.id_enroll_student_id])
+    grade_stats.invalidate_for_enrollments([instance.id_enroll_student_id])
+
+
+@receiver(post_delete, sender=models.Note)
+def update_final_grade_on_note_delete(sender, instance, origin=None, **kwargs):
+    if not (isinstance(origin, models.Note) or getattr(origin, 'model', None) is models.Note):
+        return
+    final_grade.recompute_final_grades([instance.id_enroll_student_id])
+    grade_stats.invalidate_for_enrollments([instance.id_enroll_student_id])
+
+
+# Al eliminar una inscripción sus notas se borran en cascada: invalida las estadísticas de su curso
+@receiver(post_delete, sender=models.EnrollStudent)
+def invalidate_stats_on_enrollment_delete(sender, instance, **kwargs):
+    id_course = models.OpenCourse.objects.filter(id_open_course=instance.id_open_course_id).values_list('id_course', flat=True).first()
+    if id_course is not None:
+        grade_stats.invalidate_course(id_course)
+
+
+# Invalida el historial académico del estudiante al inscribirlo o retirarlo de un curso
+@receiver(post_save, sender=models.EnrollStudent)
+@receiver(post_delete, sender=models.EnrollStudent)
+def invalidate_transcript_on_enrollment_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transcript.invalidate(instance.id_student_id)
+
+
+# Invalida el historial académico de los inscritos si cambian los datos del curso o del curso aperturado
+# (créditos, nombre, año o semestre académico); los cursos recién creados aún no tienen inscripciones
+@receiver(post_save, sender=models.Course)
+def invalidate_transcripts_on_course_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    transcript.invalidate_for_course(instance.id_course)
+
+
+@receiver(post_save, sender=models.OpenCourse)
+def invalidate_transcripts_on_opencourse_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    transcript.invalidate_for_open_course(instance.id_open_course)
+
+
+# Si cambian los pesos de un curso, recalcula el promedio final de todas sus inscripciones
+@receiver(pre_save, sender=models.Course)
+def remember_previous_weights(sender, instance, raw=False, **kwargs):
+    instance._previous_weights = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_weights = (
+        models.Course.objects.filter(pk=instance.pk)
+        .values_list(*models.Course.NOTE_WEIGHT_FIELDS.values())
+        .first()
+    )
+
+
+@receiver(post_save, sender=models.Course)
+def update_final_grades_on_weights_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    previous = getattr(instance, '_previous_weights', None)
+    current = tuple(getattr(instance, field) for field in models.Course.NOTE_WEIGHT_FIELDS.values())
+    if previous is not None and tuple(previous) != current:
+        final_grade.recompute_course_final_grades(instance.id_course)
+
+
+# Invalida el catálogo de cursos en caché al crear, modificar o eliminar un curso
+@receiver(post_save, sender=models.Course)
+@receiver(post_delete, sender=models.Course)
+def invalidate_catalog_on_course_change(sender, instance, **kwargs):
+    course_catalog.invalidate()
+
+
+# Libera la vacante del curso aperturado al eliminar una inscripción (API, admin o cascada)
+@receiver(post_delete, sender=models.EnrollStudent)
+def release_seat_on_enrollment_delete(sender, instance, **kwargs):
+    seats.release_seat(instance.id_open_course_id)
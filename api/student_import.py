@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from api import models
+
+
+# Importación masiva de estudiantes desde un archivo CSV o JSONL.
+# El archivo se lee por lotes: cada lote se valida por columnas (una pasada de cada expresión precompilada sobre
+# la columna completa, conjuntos y una consulta para los correos y teléfonos ya registrados), las contraseñas se
+# cifran en paralelo en un pool de procesos (PBKDF2 es lento a propósito y no libera el GIL) y las filas válidas
+# se guardan en una transacción por lote.
+# Student hereda de User (herencia multitabla), por lo que Django no permite bulk_create: cada fila se guarda
+# con un único save() (la contraseña ya viene cifrada), agrupado en la transacción del lote.
+
+# Con re.MULTILINE para validar una columna completa (valores unidos por saltos de línea) en una sola pasada
+EMAIL_RE = re.compile(r'^\d{10}@unfv\.edu\.pe$', re.MULTILINE)
+PHONE_RE = re.compile(r'^\d{9}$', re.MULTILINE)
+CAREERS = frozenset(career for career, _ in models.Student.CAREER_CHOICES)
+REQUIRED_FIELDS = ('email', 'password', 'first_name', 'last_name', 'phone', 'career', 'year_admission')
+ERROR_FIELDS = ('line', 'email', 'error')
+DEFAULT_BATCH_SIZE = 500
+
+
+def read_rows(stream, file_format):
+    """
+    Genera (número de línea, dict) desde un archivo de texto CSV (con cabecera) o JSONL.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            yield line_number, {key: str(value).strip() for key, value in row.items()} if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Formato no soportado: {file_format}. Use 'csv' o 'jsonl'.")
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return 'jsonl' if extension in ('.jsonl', '.ndjson') else 'csv'
+
+
+def import_students(stream, file_format, batch_size=DEFAULT_BATCH_SIZE, workers=None, error_writer=None, progress=None):
+    """
+    Importa los estudiantes del archivo y retorna {"processed", "created", "errors"}.
+    error_writer: csv.writer opcional que recibe (line, email, error) por cada fila rechazada.
+    progress: función opcional llamada con el resumen parcial después de cada lote.
+    workers: procesos para cifrar contraseñas (None = cantidad de CPUs, 1 = sin pool).
+    """
+    summary = {"processed": 0, "created": 0, "errors": 0}
+    rows = read_rows(stream, file_format)
+    seen_emails = set()
+    seen_phones = set()
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers != 1 else None
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            valid, errors = validate_batch(batch, seen_emails, seen_phones)
+            passwords = [row['password'] for _, row in valid]
+            if pool is not None:
+                hashed = list(pool.map(make_password, passwords, chunksize=max(len(passwords) // (4 * (workers or os.cpu_count() or 1)), 1)))
+            else:
+                hashed = [make_password(password) for password in passwords]
+
+            created, save_errors = _save_batch(valid, hashed)
+            errors.extend(save_errors)
+            summary["processed"] += len(batch)
+            summary["created"] += created
+            summary["errors"] += len(errors)
+
+            if error_writer is not None:
+                error_writer.writerows(sorted(errors))
+            if progress is not None:
+                progress(dict(summary))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return summary
+
+
+def validate_batch(batch, seen_emails, seen_phones):
+    """
+    Retorna (filas válidas [(línea, fila)], errores [(línea, email, mensaje)]).
+    seen_emails/seen_phones acumulan los valores del archivo para detectar duplicados entre lotes.
+    """
+    errors = []
+    rows = []
+    for line, row in batch:
+        if row is None:
+            errors.append((line, '', "Fila con formato inválido."))
+            continue
+        row['email'] = row.get('email', '').lower()
+        rows.append((line, row))
+
+    # Cada columna del lote se valida completa: las expresiones se aplican una sola vez sobre la columna unida
+    # por saltos de línea y los años, sobre sus valores distintos; la fila solo consulta los conjuntos resultantes
+    valid_emails = _matching(EMAIL_RE, [row['email'] for _, row in rows])
+    valid_phones = _matching(PHONE_RE, [row.get('phone', '') for _, row in rows])
+    current_year = date.today().year
+    valid_years = {
+        year for year in {row.get('year_admission', '') for _, row in rows}
+        if year.isdigit() and 1900 <= int(year) <= current_year
+    }
+
+    candidates = []
+    for line, row in rows:
+        email = row['email']
+        missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            errors.append((line, email, f"Faltan los campos: {', '.join(missing)}."))
+        elif email not in valid_emails:
+            errors.append((line, email, "El email debe tener el formato: 10 dígitos seguidos de '@unfv.edu.pe'"))
+        elif row['phone'] not in valid_phones:
+            errors.append((line, email, "El número de teléfono debe tener exactamente 9 dígitos"))
+        elif row['career'] not in CAREERS:
+            errors.append((line, email, f"Carrera inválida: {row['career']}."))
+        elif row['year_admission'] not in valid_years:
+            errors.append((line, email, f"Año de ingreso inválido: {row['year_admission']}."))
+        elif email in seen_emails:
+            errors.append((line, email, "Email duplicado en el archivo."))
+        elif row['phone'] in seen_phones:
+            errors.append((line, email, "Teléfono duplicado en el archivo."))
+        else:
+            seen_emails.add(email)
+            seen_phones.add(row['phone'])
+            candidates.append((line, row))
+
+    # Una consulta por tabla para los correos y teléfonos ya registrados
+    existing_emails = set(User.objects.filter(username__in=[row['email'] for _, row in candidates]).values_list('username', flat=True))
+    existing_phones = set(models.Student.objects.filter(phone__in=[row['phone'] for _, row in candidates]).values_list('phone', flat=True))
+    valid = []
+    for line, row in candidates:
+        if row['email'] in existing_emails:
+            errors.append((line, row['email'], "El email ya está registrado."))
+        elif row['phone'] in existing_phones:
+            errors.append((line, row['email'], "El teléfono ya está registrado."))
+        else:
+            valid.append((line, row))
+    return valid, errors
+
+
+def _matching(pattern, column):
+    """
+    Retorna el conjunto de valores de la columna que coinciden completos con la expresión.
+    Un valor con saltos de línea nunca queda en el conjunto, porque findall solo retorna fragmentos de él.
+    """
+    return set(pattern.findall("\n".join(column)))
+
+
+def _save_batch(valid, hashed):
+    """
+    Guarda las filas válidas del lote en una sola transacción; retorna (creados, errores de las filas que fallen).
+    """
+    created = 0
+    errors = []
+    with transaction.atomic():
+        for (line, row), password in zip(valid, hashed):
+            student = models.Student(
+                email=row['email'],
+                password=password,
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                phone=row['phone'],
+                career=row['career'],
+                year_admission=int(row['year_admission']),
+            )
+            try:
+                # Un savepoint por fila para que un error de integridad no invalide el resto del lote
+                with transaction.atomic():
+                    student.save()
+                created += 1
+            except Exception as e:
+                errors.append((line, row['email'], str(e)))
+    return created, errors
+
+
+def open_text(uploaded_file):
+    """
+    Envuelve un archivo subido (binario) como texto UTF-8 para leerlo por líneas sin cargarlo completo.
+    """
+    return io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+
+
+def _init_worker():
+    # Los procesos del pool necesitan la configuración de Django para usar PASSWORD_HASHERS
+    import django
+    django.setup()
@@ -1,3 +1,95 @@
-from django.test import TestCase
+from datetime import date, time
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api import models
 
-# Create your tests here.
+ENROLL_URL = '/api/professor/enrollstudent'
+
+
+# Vacantes, lista de espera y promoción al retirar una inscripción (api.seats)
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SeatAllocationTests(TestCase):
+    def setUp(self):
+        self.professor = models.Professor.objects.create(
+            email='profesor@unfv.edu.pe', first_name='Ana', last_name='Ríos', phone='900000001'
+        )
+        self.course = models.Course.objects.create(name='Cálculo', study_cycle=1, credits=4, study_plan=2019, subject_code=1001)
+        self.open_course = self._open_course(section='A', capacity=2)
+        models.Schedule.objects.create(id_open_course=self.open_course, day_week=0, start_hour=time(8), end_hour=time(10))
+        self.students = [
+            models.Student.objects.create(
+                email=f'202000000{i}@unfv.edu.pe', first_name=f'Alumno{i}', last_name='Pérez',
+                phone=f'91000000{i}', career='Ingeniería Informática', year_admission=2020,
+            )
+            for i in range(4)
+        ]
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.professor).key)
+
+    def _open_course(self, section, capacity=None):
+        return models.OpenCourse.objects.create(
+            id_professor=self.professor, id_course=self.course, start_class=date(2025, 3, 3), end_class=date(2025, 7, 4),
+            academic_year=2025, academic_semester=1, professional_career='Ingeniería Informática',
+            section=section, capacity=capacity,
+        )
+
+    def _enroll(self, student):
+        return self.client.post(ENROLL_URL, {'id_student': student.id_student, 'id_open_course': self.open_course.id_open_course}, format='json')
+
+    def _enrolled_count(self):
+        self.open_course.refresh_from_db()
+        return self.open_course.enrolled_count
+
+    def test_students_beyond_capacity_go_to_the_waitlist(self):
+        self.assertEqual(self._enroll(self.students[0]).status_code, 201)
+        self.assertEqual(self._enroll(self.students[1]).status_code, 201)
+
+        response = self._enroll(self.students[2])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['waitlist_position'], 1)
+        self.assertEqual(self._enrolled_count(), 2)
+        self.assertEqual(models.EnrollStudent.objects.filter(id_open_course=self.open_course).count(), 2)
+
+    def test_bulk_enrollment_fills_the_seats_and_waitlists_the_rest(self):
+        response = self.client.post(ENROLL_URL, {
+            'id_open_course': self.open_course.id_open_course,
+            'id_student': [student.id_student for student in self.students[:3]],
+        }, format='json')
+
+        self.assertEqual([row['status'] for row in response.data['results']], ['created', 'created', 'waitlisted'])
+        self.assertEqual(self._enrolled_count(), 2)
+        self.assertTrue(models.Waitlist.objects.filter(id_open_course=self.open_course, id_student=self.students[2]).exists())
+
+    def test_duplicate_enrollment_does_not_take_a_seat(self):
+        self._enroll(self.students[0])
+
+        response = self._enroll(self.students[0])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self._enrolled_count(), 1)
+
+    def test_deleting_an_enrollment_promotes_the_first_waitlisted_student(self):
+        for student in self.students[:4]:
+            self._enroll(student)
+
+        response = self.client.delete(f'{ENROLL_URL}?id_student={self.students[0].id_student}&id_open_course={self.open_course.id_open_course}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['promoted']['id_student'], self.students[2].id_student)
+        self.assertEqual(self._enrolled_count(), 2)
+        self.assertEqual(
+            list(models.Waitlist.objects.filter(id_open_course=self.open_course).values_list('id_student', flat=True)),
+            [self.students[3].id_student],
+        )
+
+    def test_promotion_skips_students_with_a_schedule_conflict(self):
+        for student in self.students[:4]:
+            self._enroll(student)
+        # El primero en espera se inscribe en otra sección con el mismo horario
+        other = self._open_course(section='B')
+        models.Schedule.objects.create(id_open_course=other, day_week=0, start_hour=time(9), end_hour=time(11))
+        models.EnrollStudent.objects.create(id_student=self.students[2], id_open_course=other)
+
+        response = self.client.delete(f'{ENROLL_URL}?id_student={self.students[0].id_student}&id_open_course={self.open_course.id_open_course}')
+        self.assertEqual(response.data['promoted']['id_student'], self.students[3].id_student)
+        self.assertTrue(models.Waitlist.objects.filter(id_open_course=self.open_course, id_student=self.students[2]).exists())
+        self.assertEqual(self._enrolled_count(), 2)
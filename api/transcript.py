@@ -0,0 +1,134 @@
+from decimal import Decimal, ROUND_HALF_UP
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from api import models, cache_versions
+
+
+# Historial académico (récord de notas) de un estudiante: cursos por semestre con créditos y promedio final,
+# promedio ponderado por créditos de cada semestre y acumulado. Se calcula con dos consultas y se guarda en caché
+# por estudiante hasta que cambie el promedio final de alguna de sus inscripciones.
+
+PASSING_GRADE = 11
+CACHE_TIMEOUT = 60 * 60
+
+
+def get_transcript(id_student):
+    key = cache_versions.versioned_key(_namespace(id_student))
+    transcript = cache.get(key)
+    if transcript is None:
+        transcript = build_transcript(id_student)
+        cache.set(key, transcript, CACHE_TIMEOUT)
+    return transcript
+
+
+def build_transcript(id_student):
+    enrollments = models.EnrollStudent.objects.filter(id_student=id_student)
+    credits = F('id_open_course__id_course__credits')
+    graded = Q(final_grade__isnull=False)
+
+    # Consulta 1: una fila por curso llevado
+    courses = (
+        enrollments.order_by('id_open_course__academic_year', 'id_open_course__academic_semester', 'id_open_course__id_course__name')
+        .values(
+            'id_enroll_student',
+            'id_open_course',
+            'final_grade',
+            academic_year=F('id_open_course__academic_year'),
+            academic_semester=F('id_open_course__academic_semester'),
+            section=F('id_open_course__section'),
+            id_course=F('id_open_course__id_course'),
+            name=F('id_open_course__id_course__name'),
+            subject_code=F('id_open_course__id_course__subject_code'),
+            credits=credits,
+        )
+    )
+
+    # Consulta 2: agregados por semestre calculados en SQL
+    semester_totals = (
+        enrollments.values(
+            academic_year=F('id_open_course__academic_year'),
+            academic_semester=F('id_open_course__academic_semester'),
+        )
+        .annotate(
+            courses=Count('id_enroll_student'),
+            credits=Sum(credits),
+            graded_credits=Sum(credits, filter=graded),
+            approved_credits=Sum(credits, filter=Q(final_grade__gte=PASSING_GRADE)),
+            weighted_sum=Sum(
+                ExpressionWrapper(F('final_grade') * credits, output_field=DecimalField(max_digits=12, decimal_places=2)),
+                filter=graded,
+            ),
+        )
+        .order_by('academic_year', 'academic_semester')
+    )
+
+    courses_by_semester = {}
+    for course in courses:
+        course['final_grade'] = _format(course['final_grade'])
+        courses_by_semester.setdefault((course['academic_year'], course['academic_semester']), []).append(course)
+
+    semesters = []
+    cumulative_credits = 0
+    cumulative_approved = 0
+    cumulative_weighted = Decimal('0')
+    for totals in semester_totals:
+        graded_credits = totals['graded_credits'] or 0
+        weighted_sum = Decimal(totals['weighted_sum'] or 0)
+        cumulative_credits += graded_credits
+        cumulative_approved += totals['approved_credits'] or 0
+        cumulative_weighted += weighted_sum
+        semesters.append({
+            "academic_year": totals['academic_year'],
+            "academic_semester": totals['academic_semester'],
+            "courses": courses_by_semester.get((totals['academic_year'], totals['academic_semester']), []),
+            "credits": totals['credits'] or 0,
+            "graded_credits": graded_credits,
+            "approved_credits": totals['approved_credits'] or 0,
+            "semester_average": _format(_average(weighted_sum, graded_credits)),
+            "cumulative_average": _format(_average(cumulative_weighted, cumulative_credits)),
+        })
+
+    return {
+        "id_student": int(id_student),
+        "semesters": semesters,
+        "graded_credits": cumulative_credits,
+        "approved_credits": cumulative_approved,
+        "cumulative_average": _format(_average(cumulative_weighted, cumulative_credits)),
+    }
+
+
+def invalidate(id_student):
+    cache_versions.bump_version(_namespace(id_student))
+
+
+def invalidate_for_course(id_course):
+    """
+    Invalida el historial de los estudiantes inscritos en alguna apertura del curso (créditos, nombre, etc.).
+    """
+    _invalidate_students(models.EnrollStudent.objects.filter(id_open_course__id_course=id_course))
+
+
+def invalidate_for_open_course(id_open_course):
+    """
+    Invalida el historial de los estudiantes inscritos en el curso aperturado (año y semestre académico, curso).
+    """
+    _invalidate_students(models.EnrollStudent.objects.filter(id_open_course=id_open_course))
+
+
+def _invalidate_students(enrollments):
+    for id_student in set(enrollments.values_list('id_student', flat=True)):
+        invalidate(id_student)
+
+
+def _average(weighted_sum, credits):
+    if not credits:
+        return None
+    return (weighted_sum / credits).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def _format(value):
+    return str(value) if value is not None else None
+
+
+def _namespace(id_student):
+    return f"transcript:student:{id_student}"
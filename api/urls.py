@@ -1,11 +1,12 @@
 from django.urls import path
 from api.views.professor import professor_register, professor_login, professor_profile
 from api.views.student import student_register, student_login, student_profile, professor_students
-from api.views.course import courses
-from api.views.opencourse import professor_opencourse
-from api.views.enrollstudent import professor_enrollstudent, student_enrollstudent
+from api.views.course import courses, courses_search
+from api.views.auth import token_refresh, token_revoke
+from api.views.opencourse import professor_opencourse, professor_opencourse_calendar, professor_opencourse_export, professor_opencourse_stats, professor_opencourse_clone, professor_occupancy
+from api.views.enrollstudent import professor_enrollstudent, student_enrollstudent, student_conflicts
 from api.views.attendance import professor_attendance, student_attendance
-from api.views.notes import professor_note, student_note
+from api.views.notes import professor_note, student_note, student_transcript
 
 urlpatterns = [
     # Professor
@@ -13,6 +14,11 @@ urlpatterns = [
     path('professor/login', professor_login),
     path('professor/profile', professor_profile),
     path('professor/opencourse', professor_opencourse),
+    path('professor/opencourse/calendar', professor_opencourse_calendar),
+    path('professor/opencourse/export', professor_opencourse_export),
+    path('professor/opencourse/stats', professor_opencourse_stats),
+    path('professor/opencourse/clone', professor_opencourse_clone),
+    path('professor/occupancy', professor_occupancy),
     path('professor/enrollstudent', professor_enrollstudent),
     path('professor/attendance', professor_attendance),
     path('professor/note', professor_note),
@@ -22,8 +28,14 @@ urlpatterns = [
     path('student/login', student_login),
     path('student/profile', student_profile),
     path('student/enrollstudent', student_enrollstudent),
+    path('student/conflicts', student_conflicts),
     path('student/attendance', student_attendance),
     path('student/note', student_note),
+    path('student/transcript', student_transcript),
+    # Auth (tokens firmados)
+    path('auth/refresh', token_refresh),
+    path('auth/revoke', token_revoke),
     # Course
     path('courses', courses),
+    path('courses/search', courses_search),
 ]
\ No newline at end of file
@@ -1,22 +1,22 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from api.authentication import RoleTokenAuthentication, SignedTokenAuthentication
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from api import models, serializers
+from django.db import transaction
+from api import models, serializers, authorization, attendance_summary, class_calendar, roster
 from datetime import datetime
 
 
 # Vista para que un profesor pueda adjuntar (POST) o listar (GET) asistencia de un curso aperturado
 @api_view(['GET', 'POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def professor_attendance(request):
     user = request.user
     
     # Verifica que el usuario autenticado sea un profesor
-    if not hasattr(user, 'professor'):
+    if request.professor is None:
         return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
     
     # Crear Asistencia
@@ -31,10 +31,13 @@ def professor_attendance(request):
 def _create_professor_attendance(request, user):
     """
     Crea asistencias para varios alumnos inscritos en un curso aperturado usando una lista de id_enroll_student.
+    Cada elemento de la lista puede ser un id o un objeto {"id_enroll_student": ..., "attendance": ...}
+    para registrar presentes y tardanzas en el mismo pase de lista.
     Valida que las inscripciones existan y que pertenezcan a un curso del profesor autenticado.
     Valida que la fecha de la asistencia sea válida.
     Valida que la asistencia sea válida.
     Además, marca como falta (attendance=1) a los alumnos inscritos en el curso que no estén en el array id_enroll_student para esa fecha.
+    Toda la validación se hace con consultas por conjunto y las asistencias se insertan con un único bulk_create.
     """
     try:
         data = request.data.copy()
@@ -43,7 +46,7 @@ def _create_professor_attendance(request, user):
         attendance_value = data.get('attendance')
 
         # Validar campos requeridos
-        if not id_enroll_student_list or not date_attendance or attendance_value is None:
+        if not id_enroll_student_list or not date_attendance:
             return Response({"error": "Se requieren los campos 'id_enroll_student', 'date' y 'attendance'."}, status=400)
 
         # Asegurarse de que id_enroll_student_list sea una lista
@@ -61,88 +64,90 @@ def _create_professor_attendance(request, user):
         if not id_enroll_student_list:
             return Response({"error": "La lista de 'id_enroll_student' no puede estar vacía."}, status=400)
 
-        # Validar que todas las inscripciones existan
-        enrolls = list(models.EnrollStudent.objects.filter(id_enroll_student__in=id_enroll_student_list))
-        enrolls_map = {e.id_enroll_student: e for e in enrolls}
-        not_found = [eid for eid in id_enroll_student_list if eid not in enrolls_map]
+        # El campo 'attendance' es obligatorio salvo que cada elemento traiga su propio valor
+        if attendance_value is None and not all(isinstance(item, dict) and item.get('attendance') is not None for item in id_enroll_student_list):
+            return Response({"error": "Se requieren los campos 'id_enroll_student', 'date' y 'attendance'."}, status=400)
+
+        # Validar el formato de la fecha
+        try:
+            date_obj = datetime.strptime(str(date_attendance), "%Y-%m-%d").date()
+        except ValueError:
+            return Response({"error": "La fecha de asistencia debe tener el formato YYYY-MM-DD."}, status=400)
+
+        # Validar que el valor de asistencia por defecto sea válido
+        if attendance_value is not None and _parse_attendance_value(attendance_value) is None:
+            return Response({"error": "El valor de asistencia no es válido. Debe ser 0 (Presente), 1 (Ausente) o 2 (Tardanza)."}, status=400)
+
+        # Normalizar el pase de lista: (id_enroll_student, attendance) por fila, acumulando errores por fila
+        entries, errors = _normalize_attendance_entries(id_enroll_student_list, attendance_value)
+        entry_ids = [eid for eid, _ in entries]
+
+        # Validar que todas las inscripciones existan (una sola consulta)
+        enroll_course_map = dict(
+            models.EnrollStudent.objects.filter(id_enroll_student__in=entry_ids).values_list('id_enroll_student', 'id_open_course')
+        )
+        not_found = [eid for eid in entry_ids if eid not in enroll_course_map]
         if not_found:
             return Response({"error": f"Las inscripciones con id(s) {not_found} no existen."}, status=404)
+        if not entries:
+            return Response({"created": [], "errors": errors}, status=400)
 
         # Validar que todas las inscripciones pertenezcan al mismo curso aperturado
-        open_course_ids = set(e.id_open_course.id_open_course for e in enrolls)
+        open_course_ids = set(enroll_course_map.values())
         if len(open_course_ids) != 1:
             return Response({"error": "Todas las inscripciones deben pertenecer al mismo curso aperturado."}, status=400)
         open_course_id = open_course_ids.pop()
-        open_course = enrolls[0].id_open_course
 
         # Validar que el curso aperturado exista (ya está implícito si existen las inscripciones)
+        open_course = models.OpenCourse.objects.filter(id_open_course=open_course_id).first()
         if not open_course:
             return Response({"error": "El curso aperturado asociado a la inscripción no existe."}, status=404)
 
         # Validar que el curso pertenezca al profesor autenticado
-        professor = models.Professor.objects.filter(email=user.email).first()
-        if not professor or open_course.id_professor_id != professor.id_professor:
+        if not authorization.owns_open_course(request.professor, open_course):
             return Response({"error": "No tiene permisos para registrar asistencia en este curso aperturado."}, status=403)
 
         # Validar que la fecha esté dentro del rango del curso
-        if not (str(open_course.start_class) <= date_attendance <= str(open_course.end_class)):
+        if not (open_course.start_class <= date_obj <= open_course.end_class):
             return Response({"error": "La fecha de asistencia está fuera del rango de fechas del curso."}, status=400)
 
-        # Validar que la fecha corresponda a un día de la semana permitido en el horario del curso
-        date_obj = datetime.strptime(date_attendance, "%Y-%m-%d")
-        day_week = date_obj.weekday()
-        allowed_days = models.Schedule.objects.filter(id_open_course=open_course.id_open_course).values_list('day_week', flat=True)
-        if day_week not in allowed_days:
+        # Validar que la fecha sea un día de clase según el calendario (en caché) del curso
+        if not class_calendar.get_calendar(open_course).is_class_day(date_obj):
             return Response({"error": "La fecha de asistencia no corresponde a un día de clase según el horario del curso."}, status=400)
 
-        # Validar que el valor de asistencia sea válido
-        if int(attendance_value) not in [0, 1, 2]:
-            return Response({"error": "El valor de asistencia no es válido. Debe ser 0 (Presente), 1 (Ausente) o 2 (Tardanza)."}, status=400)
-
         # Obtener todos los id_enroll_student del curso aperturado
-        all_enrolls = list(models.EnrollStudent.objects.filter(id_open_course=open_course.id_open_course))
-        all_enroll_ids = [e.id_enroll_student for e in all_enrolls]
+        all_enroll_ids = list(
+            models.EnrollStudent.objects.filter(id_open_course=open_course_id)
+            .order_by('id_enroll_student')
+            .values_list('id_enroll_student', flat=True)
+        )
 
         # Evitar duplicados: solo una asistencia por inscripción y fecha
         already_exists = list(
             models.Attendance.objects.filter(
-                id_enroll_student__in=all_enroll_ids,
-                date=date_attendance
+                id_enroll_student__id_open_course=open_course_id,
+                date=date_obj
             ).values_list('id_enroll_student', flat=True)
         )
         if already_exists:
             return Response({"error": f"Ya existe una asistencia registrada para los alumnos con id_enroll_student: {already_exists} en esta fecha."}, status=400)
 
-        # Crear las asistencias para los alumnos presentes (los que están en id_enroll_student_list)
-        created_attendances = []
-        errors = []
-        for eid in id_enroll_student_list:
-            attendance_data = {
-                'id_enroll_student': eid,
-                'date': date_attendance,
-                'attendance': attendance_value
-            }
-            serializer = serializers.AttendanceSerializer(data=attendance_data)
-            if serializer.is_valid():
-                serializer.save()
-                created_attendances.append(serializer.data)
-            else:
-                errors.append({"id_enroll_student": eid, "errors": serializer.errors})
-
-        # Crear las asistencias para los alumnos ausentes (los que NO están en id_enroll_student_list)
-        absent_ids = [eid for eid in all_enroll_ids if eid not in id_enroll_student_list]
-        for eid in absent_ids:
-            attendance_data = {
-                'id_enroll_student': eid,
-                'date': date_attendance,
-                'attendance': 1  # 1 = Ausente
-            }
-            serializer = serializers.AttendanceSerializer(data=attendance_data)
-            if serializer.is_valid():
-                serializer.save()
-                created_attendances.append(serializer.data)
-            else:
-                errors.append({"id_enroll_student": eid, "errors": serializer.errors})
+        # Construir las asistencias de los alumnos listados y marcar como ausentes (1) al resto
+        listed_ids = set(entry_ids) | {error["id_enroll_student"] for error in errors}
+        attendances = [
+            models.Attendance(id_enroll_student_id=eid, date=date_obj, attendance=value)
+            for eid, value in entries
+        ]
+        attendances.extend(
+            models.Attendance(id_enroll_student_id=eid, date=date_obj, attendance=1)
+            for eid in all_enroll_ids if eid not in listed_ids
+        )
+
+        # Insertar todo el pase de lista en una sola transacción (bulk_create no dispara señales, el resumen se actualiza aquí)
+        with transaction.atomic():
+            created = models.Attendance.objects.bulk_create(attendances)
+            attendance_summary.apply_attendance_changes(added=created)
+        created_attendances = serializers.AttendanceSerializer(created, many=True).data
 
         if errors:
             return Response({
@@ -154,11 +159,51 @@ def _create_professor_attendance(request, user):
     except Exception as e:
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
+
+def _parse_attendance_value(value):
+    """
+    Convierte el valor de asistencia a entero; retorna None si no es uno de los ATTENDANCE_CHOICES.
+    """
+    try:
+        value = int(value)
+    except (ValueError, TypeError):
+        return None
+    return value if value in dict(models.Attendance.ATTENDANCE_CHOICES) else None
+
+
+def _normalize_attendance_entries(id_enroll_student_list, attendance_value):
+    """
+    Convierte la lista recibida en pares (id_enroll_student, attendance).
+    Los elementos inválidos o repetidos se devuelven como errores por fila en vez de abortar el pase de lista.
+    """
+    entries = []
+    errors = []
+    seen = set()
+    for item in id_enroll_student_list:
+        raw_id, raw_value = (item.get('id_enroll_student'), item.get('attendance', attendance_value)) if isinstance(item, dict) else (item, attendance_value)
+        try:
+            eid = int(raw_id)
+        except (ValueError, TypeError):
+            errors.append({"id_enroll_student": raw_id, "errors": {"id_enroll_student": ["Debe ser un id válido."]}})
+            continue
+        value = _parse_attendance_value(raw_value)
+        if value is None:
+            errors.append({"id_enroll_student": eid, "errors": {"attendance": ["El valor de asistencia no es válido."]}})
+            continue
+        if eid in seen:
+            errors.append({"id_enroll_student": eid, "errors": {"id_enroll_student": ["La inscripción está repetida en el pase de lista."]}})
+            continue
+        seen.add(eid)
+        entries.append((eid, value))
+    return entries, errors
+
+
 # Función auxiliar para listar asistencia de un curso aperturado
 def _list_professor_attendance(request, user):
     """
     Dado el id de un curso aperturado (open_course), retorna la lista de asistencia de ese curso,
     agrupada por matrícula (id_enroll_student), incluyendo los datos completos del estudiante y la lista de asistencias.
+    Con ?summary=1 retorna el resumen de asistencia de cada alumno en vez de su historial completo.
     """
     try:
         id_open_course = request.query_params.get('id_open_course') or request.data.get('id_open_course')
@@ -171,37 +216,25 @@ def _list_professor_attendance(request, user):
             return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=404)
 
         # Validar que el curso pertenezca al profesor autenticado
-        professor = models.Professor.objects.filter(email=user.email).first()
-        if not professor or open_course.id_professor_id != professor.id_professor:
+        professor = request.professor
+        if not authorization.owns_open_course(professor, open_course):
             return Response({"error": "No tiene permisos para ver la asistencia de este curso aperturado."}, status=403)
 
-        # Obtener todas las matrículas de estudiantes a ese curso aperturado
-        enrollments = models.EnrollStudent.objects.filter(id_open_course=id_open_course).select_related('id_student')
-        enroll_ids = [enroll.id_enroll_student for enroll in enrollments]
+        # Modo resumen: una fila de AttendanceSummary por alumno en vez de todas sus asistencias
+        if _is_summary_requested(request):
+            return Response(_list_attendance_summaries(id_open_course), status=200)
 
-        # Mapear enrollments por id para acceso rápido
-        enroll_map = {enroll.id_enroll_student: enroll for enroll in enrollments}
+        # Obtener todas las matrículas del curso con su estudiante y sus asistencias (dos consultas en total)
+        enrollments = roster.course_enrollments_with_attendance(id_open_course)
 
-        # Obtener todas las asistencias de esos estudiantes en ese curso
-        attendances = models.Attendance.objects.filter(id_enroll_student__in=enroll_ids)
-
-        # Agrupar asistencias por matrícula
-        from collections import defaultdict
-        attendance_by_enroll = defaultdict(list)
-        for att in attendances:
-            attendance_by_enroll[att.id_enroll_student_id].append(att)
-
-        # Preparar respuesta agrupada
-        from api import serializers  # Importar aquí para evitar import circular
+        # Preparar respuesta agrupada por matrícula
         result = []
-        for enroll_id in enroll_ids:
-            enroll = enroll_map[enroll_id]
-            student = enroll.id_student
+        for enroll in enrollments:
             # Serializar todos los campos del estudiante
-            student_data = serializers.StudentSerializer(student).data
+            student_data = serializers.StudentSerializer(enroll.id_student).data
             # Serializar asistencias de esta matrícula
             attendance_list = []
-            for att in attendance_by_enroll.get(enroll_id, []):
+            for att in enroll.attendance_set.all():
                 attendance_list.append({
                     "id_attendance": att.id_attendance,
                     "date": att.date,
@@ -210,7 +243,7 @@ def _list_professor_attendance(request, user):
                     "updated_at": att.updated_at
                 })
             result.append({
-                "id_enroll_student": enroll_id,
+                "id_enroll_student": enroll.id_enroll_student,
                 "student": student_data,
                 "attendance": attendance_list
             })
@@ -220,15 +253,45 @@ def _list_professor_attendance(request, user):
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
 
+def _is_summary_requested(request):
+    return str(request.query_params.get('summary', '')).lower() in ('1', 'true')
+
+
+def _list_attendance_summaries(id_open_course):
+    """
+    Retorna, por cada matrícula del curso aperturado, los datos del estudiante y su resumen de asistencia.
+    """
+    enrollments = list(roster.course_enrollments(id_open_course))
+    summaries = attendance_summary.get_summaries(enroll.id_enroll_student for enroll in enrollments)
+    calendar = class_calendar.get_calendar(id_open_course)
+    return [
+        {
+            "id_enroll_student": enroll.id_enroll_student,
+            "student": serializers.StudentSerializer(enroll.id_student).data,
+            "summary": _summary_data(summaries[enroll.id_enroll_student], calendar),
+        }
+        for enroll in enrollments
+    ]
+
+
+def _summary_data(summary, calendar):
+    """
+    Serializa el resumen agregando la tasa de faltas sobre las clases dictadas a la fecha según el calendario del curso.
+    """
+    data = serializers.AttendanceSummarySerializer(summary).data
+    data["classes_held"] = calendar.classes_until()
+    data["total_classes"] = len(calendar)
+    data["absence_rate"] = str(calendar.absence_rate(summary.absent_count))
+    return data
+
+
 # Vista para que un estudiante pueda listar su asistencia en un curso aperturado
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def student_attendance(request):
-    user = request.user
-
     # Verifica que el usuario autenticado sea un estudiante
-    if not hasattr(user, 'student'):
+    if request.student is None:
         return Response({"error": "Solo los estudiantes pueden acceder a este recurso."}, status=403)
 
     # Obtener el id_enroll_student de los parámetros de la petición
@@ -237,13 +300,19 @@ def student_attendance(request):
         return Response({"error": "Se requiere el campo 'id_enroll_student' como query param o en el body."}, status=400)
 
     # Obtener el estudiante autenticado
-    student = get_object_or_404(models.Student, email=user.email)
+    student = request.student
 
     # Buscar la matrícula del estudiante en ese curso aperturado
     enroll = models.EnrollStudent.objects.filter(id_student=student.id_student, id_enroll_student=id_enroll_student).first()
     if not enroll:
         return Response({"error": "No se encontró matrícula para el estudiante en el curso aperturado especificado."}, status=404)
 
+    # Modo resumen: retorna solo la fila de AttendanceSummary de la matrícula
+    if _is_summary_requested(request):
+        summary = attendance_summary.get_summaries([enroll.id_enroll_student])[enroll.id_enroll_student]
+        calendar = class_calendar.get_calendar(enroll.id_open_course_id)
+        return Response(_summary_data(summary, calendar), status=status.HTTP_200_OK)
+
     # Obtener todas las asistencias de esa matrícula
     attendances = models.Attendance.objects.filter(id_enroll_student=enroll.id_enroll_student)
     serializer = serializers.AttendanceSerializer(attendances, many=True)
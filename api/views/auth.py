@@ -0,0 +1,54 @@
+from api import authentication
+from django.core import signing
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+
+# Vista para renovar los tokens firmados a partir de un refresh token
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([])
+def token_refresh(request):
+    """
+    Canjea el refresh token recibido por un par nuevo de tokens (access y refresh).
+    El refresh token usado queda revocado.
+    """
+    refresh_token = request.data.get('refresh')
+    if not refresh_token:
+        return Response({"error": "Se requiere el campo 'refresh'."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        tokens = authentication.refresh_tokens(str(refresh_token))
+    except signing.BadSignature:
+        return Response({"error": "Refresh token inválido, expirado o revocado."}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response(tokens, status=status.HTTP_200_OK)
+
+
+# Vista para revocar los tokens firmados (cierre de sesión)
+@api_view(['POST'])
+@authentication_classes([authentication.SignedTokenAuthentication, authentication.RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def token_revoke(request):
+    """
+    Revoca el access token firmado con el que se autenticó la petición (si es uno) y el refresh token
+    enviado en el campo 'refresh' (opcional).
+    """
+    revoked = []
+    if isinstance(request.auth, dict):
+        authentication.revoke(request.auth)
+        revoked.append("access")
+
+    refresh_token = request.data.get('refresh')
+    if refresh_token:
+        try:
+            payload = authentication.verify_token(str(refresh_token), 'refresh')
+        except signing.BadSignature:
+            return Response({"error": "Refresh token inválido, expirado o revocado."}, status=status.HTTP_400_BAD_REQUEST)
+        if payload['uid'] != request.user.id:
+            return Response({"error": "El refresh token pertenece a otro usuario."}, status=status.HTTP_403_FORBIDDEN)
+        authentication.revoke(payload)
+        revoked.append("refresh")
+
+    return Response({"revoked": revoked}, status=status.HTTP_200_OK)
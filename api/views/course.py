@@ -1,6 +1,7 @@
-from api import models, serializers
+from api import course_catalog, course_search
+from django.utils.http import parse_etags
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
+from api.authentication import RoleTokenAuthentication, SignedTokenAuthentication
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -8,15 +9,55 @@ from rest_framework.response import Response
 
 # Vista para obtener la lista de cursos
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def courses(request):
+    """
+    Retorna el catálogo de cursos, opcionalmente filtrado por study_plan, study_cycle, course_type y study_type.
+    La respuesta lleva un ETag; si el cliente envía If-None-Match con el ETag vigente se responde 304 sin cuerpo.
+    """
     user = request.user
-    
-    # Obtiene todos los cursos de la base de datos
-    courses = models.Course.objects.all()
-    # Serializa la lista de cursos
-    serializer = serializers.CourseSerializer(instance=courses, many=True)
-    
+
+    # Valida los filtros recibidos como query params
+    filters, error = course_catalog.parse_filters(request.query_params)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Si el cliente ya tiene la versión vigente del catálogo no se vuelve a enviar
+    current_etag = course_catalog.etag(filters)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        client_etags = [value.removeprefix('W/') for value in parse_etags(if_none_match)]
+        if '*' in client_etags or current_etag in client_etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': current_etag})
+
+    # Obtiene la lista de cursos serializados (desde la caché si el catálogo no cambió)
+    data = course_catalog.get_catalog(filters)
+
     # Retorna la lista de cursos serializados
-    return Response(serializer.data, status=status.HTTP_200_OK) 
\ No newline at end of file
+    return Response(data, status=status.HTTP_200_OK, headers={'ETag': current_etag})
+
+
+# Vista para buscar cursos por nombre o código de asignatura
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def courses_search(request):
+    """
+    Retorna los cursos que coinciden con la búsqueda ?q=... (sin distinguir tildes ni mayúsculas),
+    ordenados por relevancia. ?limit=... indica la cantidad máxima de resultados.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"error": "Se requiere el campo 'q' como query param en la URL."}, status=status.HTTP_400_BAD_REQUEST)
+
+    limit = request.query_params.get('limit', str(course_search.DEFAULT_LIMIT))
+    if not limit.isdigit() or int(limit) < 1:
+        return Response({"error": "El campo 'limit' debe ser un número entero positivo."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = course_search.search(query, limit=min(int(limit), course_search.MAX_LIMIT))
+        return Response(results, status=status.HTTP_200_OK)
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
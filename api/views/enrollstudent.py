@@ -1,21 +1,22 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from api.authentication import RoleTokenAuthentication, SignedTokenAuthentication
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from api import models, serializers
+from django.db import transaction
+from api import models, serializers, attendance_summary, authorization, roster, transcript, schedule_conflicts, seats
+import csv
 
 
 # Vista para que un profesor pueda adjuntar (POST) o listar (GET) alumnos en un curso aperturado
 @api_view(['GET', 'POST', 'DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def professor_enrollstudent(request):
     user = request.user
     
     # Verifica que el usuario autenticado sea un profesor
-    if not hasattr(user, 'professor'):
+    if request.professor is None:
         return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
     
     # Adjuntar a un alumno a un Curso
@@ -33,13 +34,18 @@ def professor_enrollstudent(request):
 def _create_professor_enrollstudent(request, user):
     try:
         # Obtiene la instancia del profesor autenticado
-        professor = get_object_or_404(models.Professor, email=user.email)
-
-        enrollstudent_data = request.data.copy()
+        professor = request.professor
 
         # Validar que se reciban los ids requeridos
-        id_student = enrollstudent_data.get("id_student")
-        id_open_course = enrollstudent_data.get("id_open_course")
+        id_student = request.data.get("id_student")
+        id_open_course = request.data.get("id_open_course")
+
+        # Inscripción en lote: lista de id_student, lista de correos ('emails') o archivo CSV de correos ('file').
+        # Se deriva antes de copiar request.data: un archivo grande queda en un archivo temporal que no se puede copiar
+        if id_open_course is not None and (isinstance(id_student, list) or "emails" in request.data or "file" in request.FILES):
+            return _bulk_create_professor_enrollstudent(request, professor, id_open_course)
+
+        enrollstudent_data = request.data.copy()
 
         if id_student is None or id_open_course is None:
             return Response(
@@ -63,26 +69,207 @@ def _create_professor_enrollstudent(request, user):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        # Validar que el curso aperturado pertenezca al profesor autenticado
+        if not authorization.owns_open_course(professor, open_course):
+            return Response({"error": "No tiene permisos para modificar este curso."}, status=status.HTTP_403_FORBIDDEN)
+
+        # Validar que el estudiante no esté inscrito ya en el curso (antes de ocupar una vacante)
+        if models.EnrollStudent.objects.filter(id_student=student.id_student, id_open_course=open_course.id_open_course).exists():
+            return Response(
+                {"error": "El estudiante ya está inscrito en este curso aperturado."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        # Validar que el horario del curso no se cruce con otros cursos del estudiante en el mismo semestre
+        # (con allow_conflicts=1 se inscribe de todas formas y los cruces se informan en la respuesta)
+        conflicts = schedule_conflicts.enrollment_conflicts(open_course, [student.id_student]).get(student.id_student, [])
+        if conflicts and not _allow_conflicts(request):
+            return Response(
+                {"error": "El horario del curso se cruza con otro curso del estudiante.", "conflicts": conflicts},
+                status=status.HTTP_409_CONFLICT
+            )
+
         serializer = serializers.EnrollStudentSerializer(data=enrollstudent_data)
 
         # Valida los datos del enrollstudent
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Adjuntar Alumno a Curso
-        enrollstudent = serializer.save()
+        # Ocupar una vacante de forma atómica; si el curso está lleno, el estudiante pasa a la lista de espera
+        with transaction.atomic():
+            if not seats.reserve_seat(open_course.id_open_course):
+                position = seats.add_to_waitlist(open_course.id_open_course, student.id_student)
+                return Response({
+                    "message": "El curso aperturado no tiene vacantes; el estudiante fue agregado a la lista de espera.",
+                    "id_student": student.id_student,
+                    "id_open_course": open_course.id_open_course,
+                    "waitlist_position": position,
+                }, status=status.HTTP_202_ACCEPTED)
+
+            # Adjuntar Alumno a Curso
+            enrollstudent = serializer.save()
+            models.Waitlist.objects.filter(id_open_course=open_course.id_open_course, id_student=student.id_student).delete()
 
         # Serializar el enrollstudent creado para devolver todos los campos
-        enrollstudent_serializer = serializers.EnrollStudentSerializer(enrollstudent)
+        enrollstudent_data = serializers.EnrollStudentSerializer(enrollstudent).data
+        if conflicts:
+            enrollstudent_data["conflicts"] = conflicts
 
         # Retorna todos los campos del modelo EnrollStudent
-        return Response(enrollstudent_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(enrollstudent_data, status=status.HTTP_201_CREATED)
 
     except Exception as e:
         # Error genérico para cualquier otro problema
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
 
+# Función auxiliar para inscribir varios estudiantes a la vez en un curso aperturado
+def _bulk_create_professor_enrollstudent(request, professor, id_open_course):
+    """
+    Inscribe en un curso aperturado a todos los estudiantes indicados por 'id_student' (lista de ids),
+    'emails' (lista o texto separado por comas/saltos de línea) o 'file' (CSV con una columna 'email').
+    Valida a todos los estudiantes con una sola consulta __in, omite los repetidos y los ya inscritos,
+    rechaza a quienes tengan cruce de horario (salvo allow_conflicts=1)
+    e inserta las inscripciones con bulk_create en una sola transacción.
+    Si no hay vacantes para todos, los restantes pasan a la lista de espera.
+    Retorna el resultado de cada fila en el mismo orden recibido.
+    """
+    # Validar Curso aperturado existente y que pertenezca al profesor autenticado
+    open_course = models.OpenCourse.objects.filter(id_open_course=id_open_course).first()
+    if not open_course:
+        return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=status.HTTP_404_NOT_FOUND)
+    if not authorization.owns_open_course(professor, open_course):
+        return Response({"error": "No tiene permisos para modificar este curso."}, status=status.HTTP_403_FORBIDDEN)
+
+    # Obtener las filas recibidas y el campo por el que se identifica al estudiante
+    lookup, values = _read_bulk_enroll_rows(request)
+    if not values:
+        return Response({"error": "No se recibió ningún estudiante para inscribir."}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = []
+    keys = []
+    seen = set()
+    for value in values:
+        row = {"input": value}
+        results.append(row)
+        if lookup == "id_student":
+            try:
+                key = int(value)
+            except (ValueError, TypeError):
+                row["status"] = "invalid"
+                row["error"] = "El id del estudiante debe ser un número entero."
+                keys.append(None)
+                continue
+        else:
+            key = str(value).strip().lower()
+        if key in seen:
+            row["status"] = "duplicate"
+            keys.append(None)
+            continue
+        seen.add(key)
+        keys.append(key)
+
+    # Validar todos los estudiantes con una sola consulta
+    if lookup == "id_student":
+        students = dict(models.Student.objects.filter(id_student__in=seen).values_list('id_student', 'id_student'))
+    else:
+        students = {email.lower(): id_student for id_student, email in models.Student.objects.filter(email__in=seen).values_list('id_student', 'email')}
+
+    # Estudiantes que ya están inscritos en el curso
+    already_enrolled = set(
+        models.EnrollStudent.objects.filter(id_open_course=open_course.id_open_course, id_student__in=students.values())
+        .values_list('id_student', flat=True)
+    )
+
+    # Cruces de horario de todos los estudiantes a inscribir (dos consultas)
+    conflicts = schedule_conflicts.enrollment_conflicts(open_course, set(students.values()) - already_enrolled)
+    allow_conflicts = _allow_conflicts(request)
+
+    to_create = []
+    for row, key in zip(results, keys):
+        if key is None:
+            continue
+        if key not in students:
+            row["status"] = "not_found"
+            row["error"] = "El estudiante no existe."
+            continue
+        row["id_student"] = students[key]
+        if students[key] in already_enrolled:
+            row["status"] = "already_enrolled"
+            continue
+        if students[key] in conflicts:
+            row["conflicts"] = conflicts[students[key]]
+            if not allow_conflicts:
+                row["status"] = "conflict"
+                row["error"] = "El horario del curso se cruza con otro curso del estudiante."
+                continue
+        to_create.append((row, models.EnrollStudent(id_student_id=students[key], id_open_course_id=open_course.id_open_course)))
+
+    # Ocupar las vacantes disponibles e insertar todas las inscripciones en una sola transacción;
+    # los estudiantes que no alcanzan vacante pasan a la lista de espera en el orden recibido
+    with transaction.atomic():
+        granted = seats.reserve_seats(open_course.id_open_course, len(to_create))
+        to_create, to_waitlist = to_create[:granted], to_create[granted:]
+        created = models.EnrollStudent.objects.bulk_create([enrollment for _, enrollment in to_create])
+        models.Waitlist.objects.bulk_create(
+            [models.Waitlist(id_student_id=enrollment.id_student_id, id_open_course_id=open_course.id_open_course) for _, enrollment in to_waitlist],
+            ignore_conflicts=True
+        )
+        models.Waitlist.objects.filter(
+            id_open_course=open_course.id_open_course,
+            id_student__in=[enrollment.id_student_id for enrollment in created]
+        ).delete()
+        # bulk_create no emite señales: se crean los resúmenes de asistencia de las inscripciones nuevas
+        attendance_summary.create_empty_summaries([enrollment.id_enroll_student for enrollment in created])
+    for (row, _), enrollment in zip(to_create, created):
+        row["status"] = "created"
+        row["id_enroll_student"] = enrollment.id_enroll_student
+    for row, _ in to_waitlist:
+        row["status"] = "waitlisted"
+
+    # bulk_create no dispara señales: invalidar el historial académico de los estudiantes inscritos
+    for enrollment in created:
+        transcript.invalidate(enrollment.id_student_id)
+
+    has_errors = any(row["status"] in ("invalid", "not_found", "conflict") for row in results)
+    if not has_errors:
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    else:
+        response_status = status.HTTP_207_MULTI_STATUS if created else status.HTTP_400_BAD_REQUEST
+    return Response({"created": len(created), "results": results}, status=response_status)
+
+
+def _allow_conflicts(request):
+    value = request.data.get("allow_conflicts", request.query_params.get("allow_conflicts", ""))
+    return str(value).lower() in ("1", "true")
+
+
+def _read_bulk_enroll_rows(request):
+    """
+    Retorna (campo, valores) a partir de 'id_student' (lista), 'emails' o el archivo CSV 'file'.
+    """
+    uploaded = request.FILES.get("file")
+    if uploaded is not None:
+        lines = uploaded.read().decode("utf-8-sig").splitlines()
+        rows = [row for row in csv.reader(lines) if any(cell.strip() for cell in row)]
+        header = [column.strip().lower() for column in rows[0]] if rows else []
+        if "email" in header:
+            # Con cabecera, la columna 'email' puede estar en cualquier posición
+            email_column = header.index("email")
+            rows = [row[email_column] for row in rows[1:] if len(row) > email_column]
+        else:
+            rows = [row[0] for row in rows]
+        return "email", [email.strip() for email in rows if email.strip()]
+
+    emails = request.data.get("emails")
+    if emails is not None:
+        if isinstance(emails, str):
+            emails = emails.replace("\n", ",").split(",")
+        return "email", [str(email).strip() for email in emails if str(email).strip()]
+
+    return "id_student", list(request.data.get("id_student") or [])
+
+
 # Función auxiliar para listar los estudiantes adjuntos a los cursos aperturados por el profesor
 def _list_professor_enrollstudent(request, user):
     """
@@ -111,41 +298,24 @@ def _list_professor_enrollstudent(request, user):
             )
 
         # Validar que el curso aperturado le pertenezca al profesor autenticado
-        professor = models.Professor.objects.filter(email=user.email).first()
+        professor = request.professor
         if not professor:
             return Response(
                 {"error": "Profesor autenticado no encontrado."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if open_course.id_professor_id != professor.id_professor:
+        if not authorization.owns_open_course(professor, open_course):
             return Response(
                 {"error": "No tiene permisos para ver los estudiantes de este curso aperturado."},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Obtener todas las inscripciones de estudiantes a ese curso aperturado
-        enrollments = models.EnrollStudent.objects.filter(id_open_course=open_course_id)
+        # Obtener todas las inscripciones de estudiantes a ese curso aperturado, con el estudiante en el mismo join
+        enrollments = roster.course_enrollments(open_course_id)
 
-        # Para cada inscripción, incluir la información del estudiante
-        result = []
-        for enrollment in enrollments:
-            # Serializar la inscripción
-            enrollment_data = serializers.EnrollStudentSerializer(enrollment).data
-
-            # Obtener y serializar el estudiante
-            student = models.Student.objects.filter(id_student=enrollment.id_student_id).first()
-            if student:
-                student_data = serializers.StudentSerializer(student).data
-            else:
-                student_data = None
-
-            # Reemplazar el campo id_student por el objeto student
-            enrollment_data["student"] = student_data
-            if "id_student" in enrollment_data:
-                del enrollment_data["id_student"]
-
-            result.append(enrollment_data)
+        # Para cada inscripción, incluir la información del estudiante (reemplaza el campo id_student)
+        result = [roster.roster_entry(enrollment) for enrollment in enrollments]
 
         return Response(result, status=status.HTTP_200_OK)
 
@@ -155,7 +325,7 @@ def _list_professor_enrollstudent(request, user):
 
 # Vista para que un alumno pueda ver cursos al cual está adjuntado (GET)
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def student_enrollstudent(request):
     """
@@ -163,14 +333,12 @@ def student_enrollstudent(request):
     Si se pasa un id_enroll_student, devuelve solo esa inscripción como objeto.
     Si no, devuelve todas las inscripciones como lista.
     """
-    user = request.user
-
     # Verifica que el usuario autenticado sea un estudiante
-    if not hasattr(user, 'student'):
+    if request.student is None:
         return Response({"error": "Solo los estudiantes pueden acceder a este recurso."}, status=403)
 
     # Obtener el estudiante autenticado
-    student = get_object_or_404(models.Student, email=user.email)
+    student = request.student
 
     # Obtener el id_enroll_student desde query_params o body (GET)
     id_enroll_student = _get_id_enroll_student_from_request(request)
@@ -207,69 +375,50 @@ def _get_enrollment_object(id_enroll_student, student):
     """
     Devuelve un solo objeto de inscripción enriquecido, o un Response de error si no existe.
     """
-    from api import serializers
-    try:
-        enrollment = models.EnrollStudent.objects.get(
-            id_enroll_student=id_enroll_student,
-            id_student=student.id_student
-        )
-    except models.EnrollStudent.DoesNotExist:
+    enrollment = roster.student_enrollments(student.id_student).filter(id_enroll_student=id_enroll_student).first()
+    if not enrollment:
         return Response(
             {"error": f"No se encontró la inscripción con id_enroll_student={id_enroll_student} para este estudiante."},
             status=404
         )
-
-    open_course = enrollment.id_open_course
-    professor = open_course.id_professor
-    course = open_course.id_course
-
-    open_course_data = serializers.OpenCourseSerializer(open_course).data if open_course else None
-    professor_data = serializers.ProfessorSerializer(professor).data if professor else None
-    course_data = serializers.CourseSerializer(course).data if course else None
-
-    return {
-        "id_enroll_student": enrollment.id_enroll_student,
-        "id_student": enrollment.id_student.id_student if hasattr(enrollment.id_student, 'id_student') else enrollment.id_student,
-        "open_course": open_course_data,
-        "professor": professor_data,
-        "course": course_data,
-        "academic_year": open_course.academic_year if open_course else None,
-        "academic_semester": open_course.academic_semester if open_course else None,
-        "section": open_course.section if open_course else None,
-        "created_at": enrollment.created_at,
-        "updated_at": enrollment.updated_at,
-    }
+    return roster.enrollment_detail(enrollment)
 
 
 def _get_all_enrollments_list(student):
     """
     Devuelve una lista de objetos de inscripciones enriquecidas para el estudiante.
     """
-    from api import serializers
-    enrollments = models.EnrollStudent.objects.filter(id_student=student.id_student)
-    enriched_enrollments = []
-    for enrollment in enrollments:
-        open_course = enrollment.id_open_course
-        professor = open_course.id_professor
-        course = open_course.id_course
-
-        open_course_data = serializers.OpenCourseSerializer(open_course).data if open_course else None
-        professor_data = serializers.ProfessorSerializer(professor).data if professor else None
-        course_data = serializers.CourseSerializer(course).data if course else None
-
-        enriched_enrollments.append({
-            "id_enroll_student": enrollment.id_enroll_student,
-            "id_student": enrollment.id_student.id_student if hasattr(enrollment.id_student, 'id_student') else enrollment.id_student,
-            "open_course": open_course_data,
-            "professor": professor_data,
-            "course": course_data,
-            "academic_year": open_course.academic_year if open_course else None,
-            "academic_semester": open_course.academic_semester if open_course else None,
-            "section": open_course.section if open_course else None,
-            "created_at": enrollment.created_at,
-            "updated_at": enrollment.updated_at,
-        })
-    return enriched_enrollments
+    return [roster.enrollment_detail(enrollment) for enrollment in roster.student_enrollments(student.id_student)]
+
+
+# Vista para que un alumno consulte los cruces de horario entre los cursos en los que está inscrito
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def student_conflicts(request):
+    """
+    Retorna, por semestre, los cruces de horario entre los cursos del estudiante autenticado.
+    Acepta ?academic_year=...&academic_semester=... para limitar el reporte a un semestre.
+    """
+    # Verifica que el usuario autenticado sea un estudiante
+    if request.student is None:
+        return Response({"error": "Solo los estudiantes pueden acceder a este recurso."}, status=403)
+
+    try:
+        # Obtener el estudiante autenticado
+        student = request.student
+
+        semester = {}
+        for field in ("academic_year", "academic_semester"):
+            value = request.query_params.get(field)
+            if value is not None:
+                if not value.isdigit():
+                    return Response({"error": f"El campo '{field}' debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+                semester[field] = int(value)
+        report = schedule_conflicts.student_report(student.id_student, **semester)
+        return Response(report, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
 
 # Función auxiliar para eliminar inscripción de alumno en curso aperturado
@@ -287,12 +436,12 @@ def _delete_professor_enrollstudent(request, user):
         if not id_student or not id_open_course:
             return Response({"error": "Se requieren los campos 'id_student' y 'id_open_course'."}, status=400)
 
-        # Verifica que el curso aperturado pertenezca al profesor autenticado
-        open_course = models.OpenCourse.objects.filter(id_open_course=id_open_course).first()
-        if not open_course:
+        # Verifica que el curso aperturado exista y pertenezca al profesor autenticado (sin cargar el profesor)
+        owner = authorization.owner(models.OpenCourse, id_open_course)
+        if owner is None:
             return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=404)
-        professor = user.professor
-        if open_course.id_professor.id_professor != professor.id_professor:
+        professor = request.professor
+        if not professor or owner != professor.id_professor:
             return Response({"error": "No tiene permisos para modificar este curso."}, status=403)
 
         # Busca la inscripción
@@ -300,8 +449,14 @@ def _delete_professor_enrollstudent(request, user):
         if not enrollment:
             return Response({"error": "La inscripción no existe."}, status=404)
 
-        # Elimina la inscripción
-        enrollment.delete()
-        return Response({"message": "Inscripción eliminada correctamente."}, status=200)
+        # Elimina la inscripción (la señal libera la vacante) y promueve al primero de la lista de espera
+        with transaction.atomic():
+            enrollment.delete()
+            promoted = seats.promote_from_waitlist(enrollment.id_open_course_id)
+
+        response_data = {"message": "Inscripción eliminada correctamente."}
+        if promoted:
+            response_data["promoted"] = serializers.EnrollStudentSerializer(promoted).data
+        return Response(response_data, status=200)
     except Exception as e:
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
\ No newline at end of file
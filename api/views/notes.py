@@ -1,22 +1,23 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from api.authentication import RoleTokenAuthentication, SignedTokenAuthentication
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from api import models, serializers
+from django.db import transaction
+from django.utils import timezone
+from api import models, serializers, authorization, final_grade, grade_stats, transcript, roster
 from datetime import datetime
 
 
 # Vista para que un profesor pueda adjuntar (POST) o listar (GET) nota de un curso aperturado
 @api_view(['GET', 'POST', 'DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def professor_note(request):
     user = request.user
     
     # Verifica que el usuario autenticado sea un profesor
-    if not hasattr(user, 'professor'):
+    if request.professor is None:
         return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
     
     # Crear Nota
@@ -35,12 +36,17 @@ def _create_professor_note(request, user):
     """
     Dado el id_enroll_student, crea o actualiza una nota para un alumno inscrito en ese curso.
     Si ya existe una nota del mismo tipo para la inscripción, la sobrescribe (PUT).
-    Recupera el id_open_course y el id_student a partir del id_enroll_student.
-    Valida que el curso aperturado exista y que pertenezca al profesor autenticado.
-    Valida que el alumno inscrito exista y que pertenezca al curso aperturado.
+    Valida que la inscripción exista y que su curso aperturado pertenezca al profesor autenticado (api.authorization).
     Valida que la nota sea válida.
+    Si se recibe una lista de notas (o el campo 'notes' con una lista), las registra en lote con _upsert_professor_notes.
     """
     try:
+        # Registro en lote: el body es una lista o trae el campo 'notes' con una lista
+        if isinstance(request.data, list):
+            return _upsert_professor_notes(request.data, request.professor)
+        if isinstance(request.data.get('notes'), list):
+            return _upsert_professor_notes(request.data['notes'], request.professor)
+
         data = request.data.copy()
         id_enroll_student = data.get('id_enroll_student')
         type_note = data.get('type_note')
@@ -50,22 +56,12 @@ def _create_professor_note(request, user):
         if not id_enroll_student or not type_note or note is None:
             return Response({"error": "Se requieren los campos 'id_enroll_student', 'type_note' y 'note'."}, status=400)
 
-        # Recuperar la inscripción
-        enroll = models.EnrollStudent.objects.filter(id_enroll_student=id_enroll_student).first()
-        if not enroll:
+        # Validar que la inscripción exista y que su curso pertenezca al profesor autenticado (un solo join)
+        owner = authorization.owner(models.EnrollStudent, id_enroll_student)
+        if owner is None:
             return Response({"error": f"La inscripción con id {id_enroll_student} no existe."}, status=404)
-
-        # Recuperar el curso aperturado y el estudiante desde la inscripción
-        open_course = enroll.id_open_course
-        student = enroll.id_student
-
-        # Validar que el curso aperturado exista (ya está implícito si existe la inscripción)
-        if not open_course:
-            return Response({"error": f"El curso aperturado asociado a la inscripción no existe."}, status=404)
-
-        # Validar que el curso pertenezca al profesor autenticado
-        professor = models.Professor.objects.filter(email=user.email).first()
-        if not professor or open_course.id_professor_id != professor.id_professor:
+        professor = request.professor
+        if not professor or owner != professor.id_professor:
             return Response({"error": "No tiene permisos para registrar nota en este curso aperturado."}, status=403)
 
         # Validar que la nota sea válida
@@ -106,12 +102,113 @@ def _create_professor_note(request, user):
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
 
+# Función auxiliar para crear o actualizar en lote las notas de varios alumnos
+def _upsert_professor_notes(entries, professor):
+    """
+    Recibe una lista de {"id_enroll_student", "type_note", "note"} y crea o actualiza cada nota.
+    Valida en una sola consulta que todas las inscripciones existan y pertenezcan a cursos del profesor autenticado.
+    Las notas existentes se actualizan con bulk_update y las nuevas se insertan con bulk_create en una sola transacción.
+    Retorna el resultado de cada elemento (created, updated o error) en el mismo orden recibido.
+    """
+    if not entries:
+        return Response({"error": "La lista de notas no puede estar vacía."}, status=400)
+
+    valid_types = dict(models.Note.TYPE_NOTE_CHOICES)
+    results = [None] * len(entries)
+    pending = []
+    seen = set()
+
+    # Validar cada elemento sin consultar la base de datos
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            results[index] = {"index": index, "status": "error", "errors": {"non_field_errors": ["Cada elemento debe ser un objeto."]}}
+            continue
+        id_enroll_student = entry.get('id_enroll_student')
+        type_note = entry.get('type_note')
+        note = entry.get('note')
+        result = {"index": index, "id_enroll_student": id_enroll_student, "type_note": type_note}
+        results[index] = result
+
+        if not id_enroll_student or not type_note or note is None:
+            result.update(status="error", errors={"non_field_errors": ["Se requieren los campos 'id_enroll_student', 'type_note' y 'note'."]})
+            continue
+        try:
+            id_enroll_student = int(id_enroll_student)
+            note_value = int(note)
+        except (ValueError, TypeError):
+            result.update(status="error", errors={"note": ["La nota y la inscripción deben ser números enteros."]})
+            continue
+        if note_value < 0 or note_value > 20:
+            result.update(status="error", errors={"note": ["La nota debe estar entre 0 y 20."]})
+            continue
+        if type_note not in valid_types:
+            result.update(status="error", errors={"type_note": [f"\"{type_note}\" no es una elección válida."]})
+            continue
+        if (id_enroll_student, type_note) in seen:
+            result.update(status="error", errors={"non_field_errors": ["La nota está repetida en la lista."]})
+            continue
+        seen.add((id_enroll_student, type_note))
+        result["id_enroll_student"] = id_enroll_student
+        pending.append((index, id_enroll_student, type_note, note_value))
+
+    # Validar existencia y pertenencia de todas las inscripciones con un solo join
+    enroll_ids = {id_enroll_student for _, id_enroll_student, _, _ in pending}
+    enroll_owner = authorization.owners(models.EnrollStudent, enroll_ids)
+
+    # Recuperar las notas existentes de esas inscripciones en una sola consulta
+    existing = {}
+    for existing_note in models.Note.objects.filter(
+        id_enroll_student__in=enroll_ids,
+        type_note__in={type_note for _, _, type_note, _ in pending}
+    ).order_by('-id_note'):
+        existing[(existing_note.id_enroll_student_id, existing_note.type_note)] = existing_note
+
+    to_update = []
+    to_create = []
+    now = timezone.now()
+    for index, id_enroll_student, type_note, note_value in pending:
+        result = results[index]
+        if id_enroll_student not in enroll_owner:
+            result.update(status="error", errors={"id_enroll_student": [f"La inscripción con id {id_enroll_student} no existe."]})
+        elif enroll_owner[id_enroll_student] != professor.id_professor:
+            result.update(status="error", errors={"id_enroll_student": ["No tiene permisos para registrar nota en este curso aperturado."]})
+        elif (id_enroll_student, type_note) in existing:
+            existing_note = existing[(id_enroll_student, type_note)]
+            existing_note.note = note_value
+            existing_note.updated_at = now
+            to_update.append((index, existing_note))
+        else:
+            to_create.append((index, models.Note(id_enroll_student_id=id_enroll_student, type_note=type_note, note=note_value)))
+
+    # Escribir todas las notas en una sola transacción
+    # (bulk_update y bulk_create no disparan señales, el promedio final y las estadísticas se actualizan aquí)
+    with transaction.atomic():
+        if to_update:
+            models.Note.objects.bulk_update([note for _, note in to_update], ['note', 'updated_at'])
+        if to_create:
+            models.Note.objects.bulk_create([note for _, note in to_create])
+        written_enroll_ids = {note.id_enroll_student_id for _, note in to_update + to_create}
+        final_grade.recompute_final_grades(written_enroll_ids)
+    grade_stats.invalidate_for_enrollments(written_enroll_ids)
+
+    for index, note in to_update:
+        results[index].update(status="updated", note=serializers.NoteSerializer(note).data)
+    for index, note in to_create:
+        results[index].update(status="created", note=serializers.NoteSerializer(note).data)
+
+    written = len(to_update) + len(to_create)
+    if written == len(entries):
+        return Response(results, status=200)
+    return Response(results, status=207 if written else 400)
+
+
 # Función auxiliar para listar notas de un curso aperturado
 def _list_professor_note(request, user):
     """
     Dado el id de un curso aperturado (open_course), retorna la lista de todas las notas registradas en ese curso,
     agrupadas por alumno (id_enroll_student), incluyendo los datos del estudiante y sus notas.
     El id_open_course se recibe como query parameter.
+    Con ?layout=matrix retorna una matriz compacta alumno x tipo de nota (ver _note_matrix).
     """
     try:
         # Obtener id_open_course desde los query params
@@ -127,25 +224,27 @@ def _list_professor_note(request, user):
             return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=404)
 
         # Validar que el curso pertenezca al profesor autenticado
-        professor = models.Professor.objects.filter(email=user.email).first()
-        if not professor or open_course.id_professor_id != professor.id_professor:
+        professor = request.professor
+        if not authorization.owns_open_course(professor, open_course):
             return Response({"error": "No tiene permisos para ver las notas de este curso aperturado."}, status=403)
 
-        # Obtener todas las inscripciones de estudiantes en el curso aperturado
-        enrolls = models.EnrollStudent.objects.filter(id_open_course=id_open_course)
+        # Modo matriz: alumno x tipo de nota con solo los valores de las notas
+        if request.query_params.get('layout') == 'matrix':
+            return Response(_note_matrix(id_open_course), status=200)
+
+        # Obtener todas las inscripciones con su estudiante (join) y sus notas (una sola consulta adicional)
+        enrolls = roster.course_enrollments_with_notes(id_open_course)
 
-        # Para cada inscripción, obtener el estudiante y sus notas
+        # Para cada inscripción, serializar el estudiante y sus notas ya precargadas
         result = []
         for enroll in enrolls:
             student = enroll.id_student
             # Serializar datos del estudiante (puedes ajustar los campos según tu serializer)
             student_data = serializers.StudentSerializer(student).data if student else None
 
-            # Obtener todas las notas de esta inscripción
-            notes = models.Note.objects.filter(id_enroll_student=enroll.id_enroll_student)
             # Serializar las notas, omitiendo el campo id_enroll_student en cada nota
             notes_data = []
-            for note in notes:
+            for note in enroll.note_set.all():
                 note_dict = serializers.NoteSerializer(note).data
                 # Eliminar id_enroll_student del dict de la nota
                 note_dict.pop('id_enroll_student', None)
@@ -154,7 +253,8 @@ def _list_professor_note(request, user):
             result.append({
                 "id_enroll_student": enroll.id_enroll_student,
                 "studnet": student_data,
-                "notes": notes_data
+                "notes": notes_data,
+                "final_grade": _format_grade(enroll.final_grade)
             })
 
         return Response(result, status=200)
@@ -162,6 +262,51 @@ def _list_professor_note(request, user):
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
 
+def _note_matrix(id_open_course):
+    """
+    Retorna las notas del curso como matriz: 'note_types' indica el orden de las columnas
+    y cada alumno trae en 'notes' el valor de cada tipo de nota (null si no tiene).
+    Usa dos consultas de valores sin importar la cantidad de alumnos.
+    """
+    note_types = [value for value, _ in models.Note.TYPE_NOTE_CHOICES]
+    column = {type_note: index for index, type_note in enumerate(note_types)}
+
+    rows = {}
+    for enroll_id, id_student, first_name, last_name, email, enroll_final_grade in (
+        models.EnrollStudent.objects.filter(id_open_course=id_open_course)
+        .order_by('id_enroll_student')
+        .values_list('id_enroll_student', 'id_student__id_student', 'id_student__first_name', 'id_student__last_name', 'id_student__email', 'final_grade')
+    ):
+        rows[enroll_id] = {
+            "id_enroll_student": enroll_id,
+            "id_student": id_student,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "notes": [None] * len(note_types),
+            "final_grade": _format_grade(enroll_final_grade),
+        }
+
+    for enroll_id, type_note, note in (
+        models.Note.objects.filter(id_enroll_student__id_open_course=id_open_course)
+        .order_by('id_note')
+        .values_list('id_enroll_student', 'type_note', 'note')
+    ):
+        if type_note in column:
+            rows[enroll_id]["notes"][column[type_note]] = note
+
+    return {
+        "id_open_course": int(id_open_course),
+        "note_types": note_types,
+        "students": list(rows.values()),
+    }
+
+
+def _format_grade(grade):
+    # Mismo formato que los DecimalField de los serializers (texto con dos decimales)
+    return str(grade) if grade is not None else None
+
+
 # Función auxiliar para borrar una nota de un curso aperturado
 
 def _delete_professor_note(request, user):
@@ -174,19 +319,15 @@ def _delete_professor_note(request, user):
         if not id_note:
             return Response({"error": "Se requiere el campo 'id_note' como query param en la URL."}, status=400)
 
-        # Buscar la nota
-        note = models.Note.objects.filter(id_note=id_note).first()
-        if not note:
+        # Validar que la nota exista y que el profesor tenga permiso para borrarla (un solo join hasta el profesor)
+        owner = authorization.owner(models.Note, id_note)
+        if owner is None:
             return Response({"error": f"La nota con id {id_note} no existe."}, status=404)
-
-        # Validar que el profesor tenga permiso para borrar la nota
-        enroll = note.id_enroll_student
-        open_course = enroll.id_open_course if enroll else None
-        professor = models.Professor.objects.filter(email=user.email).first()
-        if not open_course or not professor or open_course.id_professor_id != professor.id_professor:
+        professor = request.professor
+        if not professor or owner != professor.id_professor:
             return Response({"error": "No tiene permisos para eliminar esta nota."}, status=403)
 
-        note.delete()
+        models.Note.objects.filter(id_note=id_note).delete()
         return Response({"message": f"Nota con id {id_note} eliminada correctamente."}, status=200)
     except Exception as e:
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
@@ -194,13 +335,11 @@ def _delete_professor_note(request, user):
 
 # Vista para que un estudiante pueda listar sus notas usando id_enroll_student como query param
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def student_note(request):
-    user = request.user
-
     # Verifica que el usuario autenticado sea un estudiante
-    if not hasattr(user, 'student'):
+    if request.student is None:
         return Response({"error": "Solo los estudiantes pueden acceder a este recurso."}, status=403)
 
     # Obtener el id_enroll_student solo de los query params
@@ -209,7 +348,7 @@ def student_note(request):
         return Response({"error": "Se requiere el campo 'id_enroll_student' como query param en la URL."}, status=400)
 
     # Obtener el estudiante autenticado
-    student = models.Student.objects.filter(email=user.email).first()
+    student = request.student
     if not student:
         return Response({"error": "No se encontró el estudiante autenticado."}, status=404)
 
@@ -222,4 +361,36 @@ def student_note(request):
     notes = models.Note.objects.filter(id_enroll_student=enroll.id_enroll_student)
     serializer = serializers.NoteSerializer(notes, many=True)
 
-    return Response(serializer.data, status=200)
\ No newline at end of file
+    # Con ?final_grade=1 retorna también el promedio final ya calculado de la matrícula
+    if str(request.query_params.get('final_grade', '')).lower() in ('1', 'true'):
+        return Response({
+            "id_enroll_student": enroll.id_enroll_student,
+            "final_grade": _format_grade(enroll.final_grade),
+            "notes": serializer.data,
+        }, status=200)
+
+    return Response(serializer.data, status=200)
+
+
+# Vista para que un estudiante consulte su historial académico con promedios ponderados por créditos
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def student_transcript(request):
+    """
+    Retorna todos los semestres del estudiante con sus cursos (créditos y promedio final),
+    el promedio ponderado por créditos de cada semestre y el promedio acumulado.
+    """
+    # Verifica que el usuario autenticado sea un estudiante
+    if request.student is None:
+        return Response({"error": "Solo los estudiantes pueden acceder a este recurso."}, status=403)
+
+    try:
+        # Obtener el estudiante autenticado
+        student = request.student
+        if not student:
+            return Response({"error": "No se encontró el estudiante autenticado."}, status=404)
+
+        return Response(transcript.get_transcript(student.id_student), status=200)
+    except Exception as e:
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
@@ -1,14 +1,20 @@
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from datetime import date
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from api.authentication import RoleTokenAuthentication, SignedTokenAuthentication
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from api import models, serializers
+from api import models, serializers, authorization, pagination, class_calendar, gradebook_export, grade_stats, occupancy, semester_clone
 
 
 # Vista para que un profesor pueda crear (POST) o listar (GET) los cursos aperturados
 @api_view(['GET', 'POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def professor_opencourse(request):
     """
@@ -18,7 +24,7 @@ def professor_opencourse(request):
     user = request.user
 
     # Verifica que el usuario autenticado sea un profesor
-    if not hasattr(user, 'professor'):
+    if request.professor is None:
         return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
     
     # Si la petición es POST, crea un nuevo curso aperturado
@@ -36,7 +42,7 @@ def _create_opencourse(request, user):
     """
     try:
         # Obtiene la instancia del profesor autenticado
-        professor = get_object_or_404(models.Professor, email=user.email)
+        professor = request.professor
 
         # Copia los datos recibidos y agrega el id del profesor
         open_course_data = request.data.copy()
@@ -47,42 +53,51 @@ def _create_opencourse(request, user):
             return Response({"error": "Se requiere el campo 'schedule'"}, status=400)
         
         # Verifica que el curso especificado exista
-        print("open_course_data['id_course']")
-        print(open_course_data['id_course'])
-        get_object_or_404(models.Course, id_course=open_course_data['id_course'])
-        print("PASS")
+        get_object_or_404(models.Course, id_course=open_course_data.get('id_course'))
 
         # Serializa y valida los datos del curso aperturado
         open_course_serializer = serializers.OpenCourseSerializer(data=open_course_data)
         if not open_course_serializer.is_valid():
             return Response(open_course_serializer.errors, status=400)
 
-        # Guarda el curso aperturado en la base de datos
-        open_course_instance = open_course_serializer.save()
-
-        # Obtiene la lista de horarios a crear
+        # Valida todos los horarios antes de escribir en la base de datos
         schedule_data = open_course_data['schedule']
+        if not isinstance(schedule_data, list):
+            return Response({"error": "El campo 'schedule' debe ser una lista de horarios."}, status=400)
+        schedule_serializer = serializers.ScheduleItemSerializer(data=schedule_data, many=True)
+        if not schedule_serializer.is_valid():
+            return Response({"schedule": schedule_serializer.errors}, status=400)
 
-        # Crea cada horario asociado al curso aperturado
-        for schedule_item in schedule_data:
-            schedule_item['id_open_course'] = open_course_instance.id_open_course
-            schedule_serializer = serializers.ScheduleSerializer(data=schedule_item)
+        # Verifica que los horarios no se crucen con los de otros cursos del profesor en el mismo semestre
+        # (se arma una instancia sin guardar para que se apliquen los valores por defecto del modelo).
+        # Primero contra la ocupación en caché, para rechazar los cruces sin abrir una transacción
+        new_open_course = models.OpenCourse(**open_course_serializer.validated_data)
+        term = (professor.id_professor, new_open_course.academic_year, new_open_course.academic_semester)
+        collisions = occupancy.find_collisions(occupancy.get_occupancy(*term), schedule_serializer.validated_data)
+        if collisions:
+            return _collisions_response(collisions)
 
-            # Si algún horario no es válido, elimina el curso aperturado y retorna el error
-            if not schedule_serializer.is_valid():
-                open_course_instance.delete()
-                return Response(schedule_serializer.errors, status=400)
+        # Guarda el curso aperturado y sus horarios en una sola transacción: o se crea todo o nada
+        with transaction.atomic():
+            # Bloquea la fila del profesor y vuelve a verificar contra la base de datos: dos creaciones simultáneas
+            # del mismo profesor pasan la verificación en caché, pero solo una a la vez llega a este punto
+            models.Professor.objects.select_for_update().filter(id_professor=professor.id_professor).exists()
+            collisions = occupancy.find_collisions(occupancy.build_occupancy(*term), schedule_serializer.validated_data)
+            if collisions:
+                return _collisions_response(collisions)
 
-            # Guarda el horario en la base de datos
-            schedule_serializer.save()
+            open_course_instance = open_course_serializer.save()
+            schedules = models.Schedule.objects.bulk_create([
+                models.Schedule(id_open_course=open_course_instance, **schedule_item)
+                for schedule_item in schedule_serializer.validated_data
+            ])
 
-        # Obtiene todos los horarios creados para el curso aperturado
-        schedules_from_db = models.Schedule.objects.filter(id_open_course=open_course_instance.id_open_course)
-        all_schedules_serializer = serializers.ScheduleSerializer(instance=schedules_from_db, many=True)
+        # bulk_create no emite señales: se invalida la ocupación del profesor explícitamente
+        occupancy.invalidate(professor.id_professor)
 
-        # Prepara la respuesta con los datos del curso aperturado y sus horarios
+        # Prepara la respuesta con los datos del curso aperturado y sus horarios (sin volver a consultar Schedule)
         open_course_response = open_course_serializer.data.copy()
-        open_course_response["schedule"] = all_schedules_serializer.data
+        open_course_response["schedule"] = serializers.ScheduleSerializer(instance=schedules, many=True).data
 
         return Response(open_course_response, status=201)
 
@@ -97,47 +112,325 @@ def _create_opencourse(request, user):
         return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
 
 
+def _collisions_response(collisions):
+    return Response({
+        "error": "Los horarios se cruzan con otros cursos del profesor en el mismo semestre.",
+        "collisions": [
+            {"day_week": item['day_week'], "start_hour": item['start_hour'], "end_hour": item['end_hour']}
+            for item in collisions
+        ],
+    }, status=409)
+
+
 # Función auxiliar para listar los cursos aperturados por el profesor autenticado, incluyendo sus horarios y detalles completos del curso
 def _list_professor_opencourses(request, user):
     """
     Retorna la lista de cursos aperturados por el profesor autenticado, incluyendo sus horarios
     y la información completa del curso en el campo 'course' (en vez de 'id_course').
+    Filtros opcionales (query params): academic_year, academic_semester, section, professional_career.
+    Si se envía ?page_size=... o ?cursor=... la respuesta se pagina por cursor ({next, previous, results}).
     """
     try:
         # Obtiene la instancia del profesor autenticado
-        professor = get_object_or_404(models.Professor, email=user.email)
-        
-        # Obtiene todos los cursos aperturados por el profesor
-        open_courses = models.OpenCourse.objects.filter(id_professor=professor.id_professor)
-        response_data = []
-        
-        # Para cada curso aperturado, serializa sus datos, los de sus horarios y el curso completo
-        for open_course in open_courses:
-            open_course_serializer = serializers.OpenCourseSerializer(instance=open_course)
-            open_course_data = open_course_serializer.data.copy()
-
-            # Serializar el curso completo
-            course_instance = models.Course.objects.filter(id_course=open_course.id_course_id).first()
-            if course_instance:
-                course_serializer = serializers.CourseSerializer(instance=course_instance)
-                open_course_data["course"] = course_serializer.data
-            else:
-                open_course_data["course"] = None
-
-            # Eliminar el campo id_course del resultado
-            if "id_course" in open_course_data:
-                del open_course_data["id_course"]
-
-            # Serializar los horarios
-            schedules = models.Schedule.objects.filter(id_open_course=open_course.id_open_course)
-            schedule_serializer = serializers.ScheduleSerializer(instance=schedules, many=True)
-            open_course_data["schedule"] = schedule_serializer.data
-
-            response_data.append(open_course_data)
-        
+        professor = request.professor
+
+        # Cursos aperturados del profesor con el curso en el mismo join y los horarios en una sola consulta adicional
+        open_courses = (
+            models.OpenCourse.objects.filter(id_professor=professor.id_professor)
+            .select_related('id_course')
+            .prefetch_related(Prefetch('schedules', queryset=models.Schedule.objects.order_by('id_schedule')))
+            .order_by('-id_open_course')
+        )
+
+        # Aplica los filtros enviados como query params
+        for field in ('academic_year', 'academic_semester'):
+            value = request.query_params.get(field)
+            if value is not None:
+                if not value.isdigit():
+                    return Response({"error": f"El campo '{field}' debe ser un número entero."}, status=400)
+                open_courses = open_courses.filter(**{field: int(value)})
+        for field in ('section', 'professional_career'):
+            value = request.query_params.get(field)
+            if value:
+                open_courses = open_courses.filter(**{field: value})
+
+        paginator = pagination.OpenCourseCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(open_courses, request)
+            return paginator.get_paginated_response([_opencourse_with_details(open_course) for open_course in page])
+
         # Retorna la lista de cursos aperturados con sus horarios y detalles completos del curso
+        return Response([_opencourse_with_details(open_course) for open_course in open_courses], status=200)
+
+    except NotFound as e:
+        # Cursor inválido
+        return Response({"error": str(e.detail)}, status=400)
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
+
+
+def _opencourse_with_details(open_course):
+    """
+    Serializa un curso aperturado con 'course' y 'schedule'.
+    Requiere select_related('id_course') y prefetch_related('schedules') para no generar consultas adicionales.
+    """
+    open_course_data = serializers.OpenCourseSerializer(instance=open_course).data.copy()
+
+    # Serializar el curso completo en lugar del campo id_course
+    course_instance = open_course.id_course
+    open_course_data["course"] = serializers.CourseSerializer(instance=course_instance).data if course_instance else None
+    open_course_data.pop("id_course", None)
+
+    # Serializar los horarios (ya cargados por el prefetch)
+    open_course_data["schedule"] = serializers.ScheduleSerializer(instance=open_course.schedules.all(), many=True).data
+    return open_course_data
+
+
+# Vista para clonar los cursos aperturados de un semestre en otro
+@api_view(['POST'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def professor_opencourse_clone(request):
+    """
+    Clona los cursos aperturados (y sus horarios) de un semestre en otro.
+    Campos: source_year, source_semester, target_year, target_semester, start_date (opcional, YYYY-MM-DD)
+    y dry_run (opcional). Los profesores con is_staff clonan todos los cursos; el resto solo los suyos.
+    """
+    # Verifica que el usuario autenticado sea un profesor
+    if request.professor is None:
+        return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
+
+    try:
+        semesters = {}
+        for field in ('source_year', 'source_semester', 'target_year', 'target_semester'):
+            value = request.data.get(field)
+            if value is None or not str(value).isdigit():
+                return Response({"error": f"Se requiere el campo '{field}' como número entero."}, status=400)
+            semesters[field] = int(value)
+
+        start_date = request.data.get('start_date')
+        if start_date:
+            try:
+                start_date = date.fromisoformat(str(start_date))
+            except ValueError:
+                return Response({"error": "El campo 'start_date' debe tener el formato YYYY-MM-DD."}, status=400)
+        else:
+            start_date = None
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        professor = request.professor
+        professor_ids = None if professor.is_staff else [professor.id_professor]
+
+        try:
+            result = semester_clone.clone_semester(
+                professor_ids=professor_ids, start_date=start_date, dry_run=dry_run, **semesters
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        result["dry_run"] = dry_run
+        return Response(result, status=200 if dry_run or not result["created"] else 201)
+
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
+
+
+# Vista para que un profesor consulte su ocupación semanal en un semestre
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def professor_occupancy(request):
+    """
+    Retorna los intervalos ocupados por los horarios del profesor autenticado en cada día de la semana.
+    Query params: academic_year y academic_semester (obligatorios).
+    Si además se envían day_week, start_hour y end_hour, indica si ese horario está libre ('available').
+    """
+    # Verifica que el usuario autenticado sea un profesor
+    if request.professor is None:
+        return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
+
+    try:
+        academic_year = request.query_params.get('academic_year')
+        academic_semester = request.query_params.get('academic_semester')
+        if not academic_year or not academic_semester:
+            return Response({"error": "Se requieren los campos 'academic_year' y 'academic_semester' como query params en la URL."}, status=400)
+        if not academic_year.isdigit() or not academic_semester.isdigit():
+            return Response({"error": "Los campos 'academic_year' y 'academic_semester' deben ser números enteros."}, status=400)
+
+        professor = request.professor
+        professor_occupancy = occupancy.get_occupancy(professor.id_professor, int(academic_year), int(academic_semester))
+
+        day_names = dict(models.Schedule.DAY_WEEK_CHOICES)
+        response_data = {
+            "id_professor": professor.id_professor,
+            "academic_year": int(academic_year),
+            "academic_semester": int(academic_semester),
+            "resolution_minutes": occupancy.RESOLUTION_MINUTES,
+            "days": [
+                {
+                    "day_week": day_week,
+                    "day_name": day_names[day_week],
+                    "busy": [
+                        {"start_hour": start_hour, "end_hour": end_hour}
+                        for start_hour, end_hour in professor_occupancy.busy_intervals(day_week)
+                    ],
+                }
+                for day_week in range(7)
+            ],
+        }
+
+        # Consulta opcional de disponibilidad de un horario puntual
+        if 'day_week' in request.query_params:
+            schedule_serializer = serializers.ScheduleItemSerializer(data={
+                "day_week": request.query_params.get('day_week'),
+                "start_hour": request.query_params.get('start_hour'),
+                "end_hour": request.query_params.get('end_hour'),
+            })
+            if not schedule_serializer.is_valid():
+                return Response(schedule_serializer.errors, status=400)
+            slot = schedule_serializer.validated_data
+            response_data["available"] = not professor_occupancy.collides(slot['day_week'], slot['start_hour'], slot['end_hour'])
+
         return Response(response_data, status=200)
-    
+
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
+
+
+# Vista para que un profesor consulte el calendario de clases (fechas concretas) de un curso aperturado
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def professor_opencourse_calendar(request):
+    """
+    Retorna las fechas de clase de un curso aperturado, generadas a partir de sus horarios entre start_class y end_class.
+    El id del curso aperturado se recibe como query param (?id_open_course=...).
+    """
+    # Verifica que el usuario autenticado sea un profesor
+    if request.professor is None:
+        return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
+
+    try:
+        id_open_course = request.query_params.get('id_open_course')
+        if not id_open_course:
+            return Response({"error": "Se requiere el campo 'id_open_course' como query param en la URL."}, status=400)
+
+        # Validar que el curso aperturado exista
+        open_course = models.OpenCourse.objects.filter(id_open_course=id_open_course).first()
+        if not open_course:
+            return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=404)
+
+        # Validar que el curso pertenezca al profesor autenticado
+        professor = request.professor
+        if not authorization.owns_open_course(professor, open_course):
+            return Response({"error": "No tiene permisos para ver el calendario de este curso aperturado."}, status=403)
+
+        calendar = class_calendar.get_calendar(open_course)
+        return Response({
+            "id_open_course": open_course.id_open_course,
+            "start_class": open_course.start_class,
+            "end_class": open_course.end_class,
+            "total_classes": len(calendar),
+            "classes_held": calendar.classes_until(),
+            "next_class": calendar.next_class(),
+            "class_dates": list(calendar.dates),
+        }, status=200)
+
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
+
+
+# Vista para que un profesor exporte (streaming) la sábana de asistencias y notas de un curso aperturado
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer])
+def professor_opencourse_export(request):
+    """
+    Exporta una fila por alumno inscrito con una columna por fecha de clase y una por tipo de nota.
+    Recibe ?id_open_course=... y ?export=csv|jsonl (por defecto csv); no se usa ?format= porque DRF lo reserva
+    para elegir el renderer. Los errores se responden siempre en JSON.
+    La respuesta se genera por lotes, por lo que la memoria no crece con la cantidad de alumnos o asistencias.
+    """
+    # Verifica que el usuario autenticado sea un profesor
+    if request.professor is None:
+        return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
+
+    try:
+        id_open_course = request.query_params.get('id_open_course')
+        export_format = request.query_params.get('export', 'csv')
+        if not id_open_course:
+            return Response({"error": "Se requiere el campo 'id_open_course' como query param en la URL."}, status=400)
+        if export_format not in ('csv', 'jsonl'):
+            return Response({"error": "El formato debe ser 'csv' o 'jsonl'."}, status=400)
+
+        # Validar que el curso aperturado exista
+        open_course = models.OpenCourse.objects.filter(id_open_course=id_open_course).first()
+        if not open_course:
+            return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=404)
+
+        # Validar que el curso pertenezca al profesor autenticado
+        professor = request.professor
+        if not authorization.owns_open_course(professor, open_course):
+            return Response({"error": "No tiene permisos para exportar este curso aperturado."}, status=403)
+
+        if export_format == 'csv':
+            response = StreamingHttpResponse(gradebook_export.stream_csv(open_course), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(gradebook_export.stream_jsonl(open_course), content_type='application/jsonl; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="opencourse_{open_course.id_open_course}.{export_format}"'
+        return response
+
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
+
+
+# Vista para que un profesor consulte las estadísticas de notas de un curso aperturado
+@api_view(['GET'])
+@authentication_classes([SignedTokenAuthentication, RoleTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def professor_opencourse_stats(request):
+    """
+    Retorna por cada tipo de nota: histograma (0-20), media, mediana, desviación estándar, percentiles
+    y porcentaje de aprobados (nota >= 11).
+    Recibe ?id_open_course=... y opcionalmente ?scope=course para incluir todas las secciones del mismo curso
+    en el mismo año y semestre académico.
+    """
+    # Verifica que el usuario autenticado sea un profesor
+    if request.professor is None:
+        return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
+
+    try:
+        id_open_course = request.query_params.get('id_open_course')
+        scope = request.query_params.get('scope', 'section')
+        if not id_open_course:
+            return Response({"error": "Se requiere el campo 'id_open_course' como query param en la URL."}, status=400)
+        if scope not in ('section', 'course'):
+            return Response({"error": "El campo 'scope' debe ser 'section' o 'course'."}, status=400)
+
+        # Validar que el curso aperturado exista
+        open_course = models.OpenCourse.objects.filter(id_open_course=id_open_course).first()
+        if not open_course:
+            return Response({"error": f"El curso aperturado con id {id_open_course} no existe."}, status=404)
+
+        # Validar que el curso pertenezca al profesor autenticado
+        professor = request.professor
+        if not authorization.owns_open_course(professor, open_course):
+            return Response({"error": "No tiene permisos para ver las estadísticas de este curso aperturado."}, status=403)
+
+        return Response({
+            "id_open_course": open_course.id_open_course,
+            "id_course": open_course.id_course_id,
+            "scope": scope,
+            "passing_note": grade_stats.PASSING_NOTE,
+            "stats": grade_stats.get_stats(open_course, scope),
+        }, status=200)
+
     except Exception as e:
         # Error genérico para cualquier otro problema
-        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500) 
\ No newline at end of file
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=500)
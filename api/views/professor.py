@@ -1,8 +1,7 @@
-from api import models, serializers
-from django.shortcuts import get_object_or_404
+from api import models, serializers, authentication, login
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.authtoken.models import Token
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -28,31 +27,22 @@ def professor_register(request):
 
 
 # Vista para login de profesor
-@api_view(['POST'])
-def professor_login(request):
-    # Busca al profesor por email
-    professor = get_object_or_404(models.Professor, email=request.data['email'])
-    
-    # Verifica la contraseña
-    if not professor.check_password(request.data['password']):
-        return Response({"error": "Invalid username or password"}, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Obtiene o crea el token de autenticación
-    token, created = Token.objects.get_or_create(user=professor)
-    serializer = serializers.ProfessorSerializer(instance=professor)
-    
-    # Retorna el token y los datos del profesor
-    return Response({"token": token.key, "professor": serializer.data}, status=status.HTTP_200_OK)
+# Es asíncrona: la verificación de la contraseña corre en el pool acotado de api.login sin bloquear al worker
+@csrf_exempt
+@require_POST
+async def professor_login(request):
+    return await login.login(request, models.Professor, serializers.ProfessorSerializer, 'professor')
 
 
 # Vista para obtener el perfil del profesor autenticado
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([authentication.SignedTokenAuthentication, authentication.RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def professor_profile(request):
-    user = request.user
-    # Busca al profesor por email
-    professor = get_object_or_404(models.Professor, email=user)
+    # Verifica que el usuario autenticado sea un profesor (resuelto en la autenticación)
+    if request.professor is None:
+        return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
+    professor = authentication.full_profile(request.professor)
     serializer = serializers.ProfessorSerializer(instance=professor)
     
     # Retorna los datos del profesor
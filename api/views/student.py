@@ -1,8 +1,9 @@
-from api import models, serializers
-from django.shortcuts import get_object_or_404
+from api import models, serializers, authentication, pagination, login
+from django.db.models import Q
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotFound
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -28,30 +29,22 @@ def student_register(request):
 
 
 # Vista para login de estudiante
-@api_view(['POST'])
-def student_login(request):
-    # Busca al estudiante por email
-    student = get_object_or_404(models.Student, email=request.data['email'])
-    
-    # Verifica la contraseña
-    if not student.check_password(request.data['password']):
-        return Response({"error": "Invalid username or password"}, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Obtiene o crea el token de autenticación
-    token, created = Token.objects.get_or_create(user=student)
-    serializer = serializers.StudentSerializer(instance=student)
-    
-    # Retorna el token y los datos del estudiante
-    return Response({"token": token.key, "student": serializer.data}, status=status.HTTP_200_OK)
+# Es asíncrona: la verificación de la contraseña corre en el pool acotado de api.login sin bloquear al worker
+@csrf_exempt
+@require_POST
+async def student_login(request):
+    return await login.login(request, models.Student, serializers.StudentSerializer, 'student')
 
 
 # Vista para obtener o actualizar el perfil del estudiante autenticado
 @api_view(['GET', 'PUT'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([authentication.SignedTokenAuthentication, authentication.RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def student_profile(request):
-    # Obtiene el estudiante autenticado por el usuario del request
-    student = get_object_or_404(models.Student, email=request.user.email)
+    # Obtiene el estudiante autenticado (resuelto en la autenticación)
+    if request.student is None:
+        return Response({"error": "Solo los estudiantes pueden acceder a este recurso."}, status=403)
+    student = authentication.full_profile(request.student)
 
     if request.method == 'GET':
         serializer = serializers.StudentSerializer(instance=student)
@@ -77,16 +70,65 @@ def student_profile(request):
 
 # Vista para obtener todos los estudiantes (solo para profesores autenticados)
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([authentication.SignedTokenAuthentication, authentication.RoleTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def professor_students(request):
-    user = request.user
-
+    """
+    Directorio de estudiantes para profesores.
+    Filtros opcionales (query params): career, year_admission, name (prefijo del nombre o del apellido)
+    y email (prefijo del correo). Con ?fields=campo1,campo2 solo se retornan esas columnas (id_student siempre
+    se incluye) y se evita el serializer. Si se envía ?page_size=... o ?cursor=... la respuesta se pagina por cursor.
+    """
     # Verifica que el usuario autenticado sea un profesor
-    if not hasattr(user, 'professor'):
+    if request.professor is None:
         return Response({"error": "Solo los profesores pueden acceder a este recurso."}, status=403)
 
-    # Obtiene todos los estudiantes
-    students = models.Student.objects.all()
-    serializer = serializers.StudentSerializer(students, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    try:
+        students = models.Student.objects.order_by('id_student')
+
+        # Aplica los filtros enviados como query params
+        career = request.query_params.get('career')
+        if career:
+            if career not in dict(models.Student.CAREER_CHOICES):
+                return Response({"error": f"Valor inválido para 'career': {career}."}, status=status.HTTP_400_BAD_REQUEST)
+            students = students.filter(career=career)
+        year_admission = request.query_params.get('year_admission')
+        if year_admission:
+            if not year_admission.isdigit():
+                return Response({"error": "El campo 'year_admission' debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+            students = students.filter(year_admission=int(year_admission))
+        name = request.query_params.get('name', '').strip()
+        if name:
+            # Respaldado por los índices de la migración 0029 (NOCASE en SQLite, UPPER(...) en PostgreSQL)
+            students = students.filter(Q(first_name__istartswith=name) | Q(last_name__istartswith=name))
+        email = request.query_params.get('email', '').strip().lower()
+        if email:
+            # El username es igual al email; el prefijo usa el índice NOCASE de username en SQLite
+            # y el índice *_like de la columna única en PostgreSQL
+            students = students.filter(username__startswith=email)
+
+        # Proyección opcional de columnas: se leen solo esos campos y no se instancian modelos
+        fields = request.query_params.get('fields')
+        if fields:
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+            invalid = [field for field in fields if field not in serializers.StudentSerializer.Meta.fields]
+            if invalid:
+                return Response({"error": f"Campos inválidos en 'fields': {', '.join(invalid)}."}, status=status.HTTP_400_BAD_REQUEST)
+            students = students.values(*dict.fromkeys(['id_student', *fields]))
+
+        def _serialize(rows):
+            return list(rows) if fields else serializers.StudentSerializer(rows, many=True).data
+
+        paginator = pagination.StudentCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(students, request)
+            return paginator.get_paginated_response(_serialize(page))
+
+        return Response(_serialize(students), status=status.HTTP_200_OK)
+
+    except NotFound as e:
+        # Cursor inválido
+        return Response({"error": str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        # Error genérico para cualquier otro problema
+        return Response({"error": f"Error interno del servidor: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -86,6 +86,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Compartida por todos los procesos (calendarios de clase, catálogo, historiales, estadísticas, ocupación y límites
+# de login): con la caché en memoria por defecto, una invalidación solo llegaba al proceso que la hacía.
+# La tabla se crea con: python manage.py createcachetable
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'edutrackb_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 